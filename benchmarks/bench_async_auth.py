@@ -0,0 +1,72 @@
+"""Throughput de login síncrono frente a AsyncAuthService.
+
+Uso:
+    python -m benchmarks.bench_async_auth --usuarios 20000 --logins 20000
+    python -m benchmarks.bench_async_auth --memoria
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from services.async_auth_service import AsyncAuthService
+from services.auth_service import AuthService
+from storage.local_db import LocalDB
+from storage.user_storage import UserStorage
+
+
+def preparar(ruta: str, usuarios: int) -> AuthService:
+    storage = UserStorage(LocalDB(ruta))
+    storage.crear_usuarios_bulk(
+        ((f"usuario{i}", 2) for i in range(usuarios)), chunk_size=10000
+    )
+    # Sin caché para medir el acceso a la base y no el diccionario
+    return AuthService(storage, cache_size=0)
+
+
+def nombres(usuarios: int, logins: int) -> list[str]:
+    # Uno de cada diez logins es de un nombre que no existe
+    return [
+        f"usuario{random.randrange(usuarios)}" if i % 10 else f"nadie{i}"
+        for i in range(logins)
+    ]
+
+
+def medir_sync(auth: AuthService, lote: list[str]) -> float:
+    start = time.perf_counter()
+    for nombre in lote:
+        auth.login(nombre)
+    return len(lote) / (time.perf_counter() - start)
+
+
+async def medir_async(auth: AuthService, lote: list[str], workers: int) -> float:
+    async with AsyncAuthService(auth, max_workers=workers, max_pending=4 * workers) as servicio:
+        start = time.perf_counter()
+        await asyncio.gather(*(servicio.login(nombre) for nombre in lote))
+        return len(lote) / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--usuarios', type=int, default=20000)
+    parser.add_argument('--logins', type=int, default=20000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument(
+        '--memoria', action='store_true', help='Usa una base en memoria'
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = ':memory:' if args.memoria else os.path.join(tmp, 'bench.db')
+        auth = preparar(ruta, args.usuarios)
+        lote = nombres(args.usuarios, args.logins)
+        print(f"sync          {medir_sync(auth, lote):>10.0f} logins/s")
+        for workers in args.workers:
+            rate = asyncio.run(medir_async(auth, lote, workers))
+            print(f"async x{workers:<5}  {rate:>10.0f} logins/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Memoria y tiempo de get_all() frente a get_all_batch().
+
+Uso:
+    python -m benchmarks.bench_user_batch --usuarios 1000000
+"""
+import argparse
+import time
+import tracemalloc
+
+from storage.user_storage import UserStorage
+
+
+def medir(nombre: str, cargar):
+    tracemalloc.start()
+    start = time.perf_counter()
+    resultado = cargar()
+    elapsed = time.perf_counter() - start
+    actual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{nombre:<14} {elapsed:>7.2f} s  "
+        f"retenido {actual / 2**20:>7.1f} MiB  pico {pico / 2**20:>7.1f} MiB"
+    )
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--usuarios', type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    storage = UserStorage(database=':memory:')
+    storage.crear_usuarios_bulk(
+        ((f"usuario{i}", 1 + i % 2) for i in range(args.usuarios)),
+        chunk_size=50000
+    )
+    medir('get_all', storage.get_all)
+    medir('get_all_batch', storage.get_all_batch)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,12 @@
+import sqlite3
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
 class User:
-    def __init__(self, id: int, nombre: str, rol: int):
-        self.id = id
-        self.nombre = nombre
-        self.rol = rol
+    id: int
+    nombre: str
+    rol: int
 
     @classmethod
     def from_dict(cls, data: dict):
@@ -10,4 +14,9 @@ class User:
             id=data['id'],
             nombre=data['nombre'],
             rol=data['rol']
-        )
\ No newline at end of file
+        )
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple):
+        """row_factory de sqlite3 para filas (id, nombre, rol)."""
+        return cls(*row)
@@ -0,0 +1,79 @@
+import sys
+from array import array
+from typing import Iterable, Iterator
+
+from models.user import User
+
+
+class UserBatch:
+    """Lote de usuarios en formato columnar.
+
+    Guarda los IDs y los roles en arrays de enteros y todos los nombres
+    concatenados en una sola cadena con un array de posiciones, en lugar
+    de un objeto User (y tres objetos Python más) por fila. Los User se
+    crean sólo al acceder a una fila concreta.
+    """
+
+    __slots__ = ('ids', 'roles', '_text', '_ends')
+
+    def __init__(self):
+        self.ids = array('q')
+        self.roles = array('h')
+        self._text = ''
+        self._ends = array('Q')
+
+    @classmethod
+    def from_row_batches(cls, batches: Iterable[list[tuple]]) -> 'UserBatch':
+        """Construye el lote a partir de lotes de tuplas (id, nombre, rol)."""
+        batch = cls()
+        chunks = []
+        end = 0
+        for rows in batches:
+            nombres = []
+            for id, nombre, rol in rows:
+                batch.ids.append(id)
+                batch.roles.append(rol)
+                end += len(nombre)
+                batch._ends.append(end)
+                nombres.append(nombre)
+            # Unir por lote evita tener a la vez todos los str sueltos
+            chunks.append(''.join(nombres))
+        batch._text = ''.join(chunks)
+        return batch
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> 'UserBatch':
+        return cls.from_row_batches([list(rows)])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def nombre(self, index: int) -> str:
+        start = self._ends[index - 1] if index > 0 else 0
+        return self._text[start:self._ends[index]]
+
+    def __getitem__(self, index: int) -> User:
+        if index < 0:
+            index += len(self)
+        return User(self.ids[index], self.nombre(index), self.roles[index])
+
+    def __iter__(self) -> Iterator[User]:
+        for row in self.rows():
+            yield User(*row)
+
+    def rows(self) -> Iterator[tuple[int, str, int]]:
+        """Recorre las filas como tuplas (id, nombre, rol)."""
+        text = self._text
+        start = 0
+        for id, end, rol in zip(self.ids, self._ends, self.roles):
+            yield id, text[start:end], rol
+            start = end
+
+    def nbytes(self) -> int:
+        """Memoria aproximada de los datos del lote, en bytes."""
+        return (
+            self.ids.itemsize * len(self.ids)
+            + self.roles.itemsize * len(self.roles)
+            + self._ends.itemsize * len(self._ends)
+            + sys.getsizeof(self._text)
+        )
@@ -0,0 +1,55 @@
+from models.user import User
+from services.auth_service import AuthService
+from storage.async_user_storage import AsyncUserStorage
+
+
+class AsyncAuthService:
+    """Versión asyncio de AuthService.
+
+    Delega en un AuthService síncrono (con su caché y su filtro de
+    nombres), ejecutado en el pool acotado de un AsyncUserStorage.
+    """
+
+    def __init__(
+            self,
+            auth_service: AuthService | None = None,
+            max_workers: int = 4,
+            max_pending: int = 64
+    ):
+        self.auth_service = auth_service or AuthService()
+        self.storage = AsyncUserStorage(
+            self.auth_service.user_storage,
+            max_workers=max_workers,
+            max_pending=max_pending
+        )
+
+    async def login(self, nombre: str) -> User | None:
+        """Intenta autenticar un usuario por nombre."""
+        return await self.storage.run(self.auth_service.login, nombre)
+
+    async def registrar(self, nombre: str, rol: int = 2) -> User:
+        """Registra un nuevo usuario."""
+        return await self.storage.run(self.auth_service.registrar, nombre, rol)
+
+    async def get_all(self) -> list[User]:
+        """Obtiene todos los usuarios"""
+        return await self.storage.get_all()
+
+    async def iter_page(
+            self,
+            after_id: int | None = None,
+            limit: int | None = None,
+            order_by: str = 'id',
+            descending: bool = False,
+            after: User | None = None
+    ) -> list[User]:
+        return await self.storage.iter_page(after_id, limit, order_by, descending, after)
+
+    def close(self, wait: bool = True):
+        self.storage.close(wait)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close(wait=False)
@@ -1,17 +1,52 @@
+import weakref
+
 from storage.user_storage import UserStorage
 from models.user import User
+from services.user_cache import UserCache
+from storage.change_feed import ChangeFeed
+from storage.name_filter import NameFilter
+from ui.config.settings import AppSettings
 
 
 class AuthService:
-    def __init__(self):
-        self.user_storage = UserStorage()
+    def __init__(
+            self,
+            user_storage: UserStorage | None = None,
+            cache_size: int | None = None,
+            cache_ttl: float | None = None,
+            use_name_filter: bool | None = None,
+            database: str | None = None,
+            **db_options
+    ):
+        self.user_storage = user_storage or UserStorage(
+            database=database, **db_options
+        )
+        self.cache = UserCache(
+            max_size=(AppSettings.LOGIN_CACHE_SIZE
+                      if cache_size is None else cache_size),
+            ttl=AppSettings.LOGIN_CACHE_TTL if cache_ttl is None else cache_ttl
+        )
+        # Cualquier escritura sobre la base (de este u otro servicio del
+        # proceso) invalida los nombres afectados.
+        self.user_storage.db.add_write_listener(self.cache.invalidate)
+        # Las de otros procesos llegan por el registro de cambios
+        _subscribe_cache(ChangeFeed.for_db(self.user_storage.db), self.cache)
+        if use_name_filter is None:
+            use_name_filter = AppSettings.LOGIN_NAME_FILTER
+        self.name_filter = NameFilter.for_db(
+            self.user_storage.db,
+            false_positive_rate=AppSettings.LOGIN_FILTER_FALSE_POSITIVE_RATE
+        ) if use_name_filter else None
 
     def login(self, nombre: str) -> User | None:
         """
         Intenta autenticar un usuario por nombre.
         Retorna el usuario si existe, None si no.
         """
-        return self.user_storage.get_by_nombre(nombre)
+        # Los nombres que seguro no existen se rechazan sin ir a SQLite
+        if self.name_filter and not self.name_filter.might_contain(nombre):
+            return None
+        return self.cache.get_or_load(nombre, self.user_storage.get_by_nombre)
 
     def registrar(self, nombre: str, rol: int = 2) -> User:
         """
@@ -22,4 +57,75 @@ class AuthService:
 
     def get_all_users(self):
         """Obtiene todos los usuarios"""
-        return self.user_storage.get_all()
\ No newline at end of file
+        return self.user_storage.get_all()
+
+    def get_users_batch(self, order_by: str = 'id', descending: bool = False):
+        """Obtiene todos los usuarios en formato columnar (UserBatch)"""
+        return self.user_storage.get_all_batch(order_by=order_by, descending=descending)
+
+    def get_users_window(
+            self,
+            offset: int,
+            limit: int,
+            order_by: str = 'id',
+            descending: bool = False,
+            after_id: int | None = None
+    ):
+        """Obtiene `limit` filas (id, nombre, rol) desde la posición `offset`"""
+        return self.user_storage.get_window(offset, limit, order_by, descending, after_id)
+
+    def get_users_page(
+            self,
+            after_id: int | None,
+            limit: int,
+            order_by: str = 'id',
+            descending: bool = False,
+            after: User | None = None
+    ):
+        """Obtiene la página de usuarios que sigue al usuario after_id (o after)"""
+        return self.user_storage.iter_page(after_id, limit, order_by, descending, after)
+
+    def count_users(self) -> int:
+        """Obtiene la cantidad total de usuarios"""
+        return self.user_storage.count()
+
+    def get_user_counts(self) -> dict[int, int]:
+        """Obtiene la cantidad de usuarios por rol"""
+        return self.user_storage.count_by_rol()
+
+    def buscar_usuarios(
+            self,
+            prefijo: str,
+            limit: int | None = None,
+            order_by: str = 'nombre',
+            descending: bool = False
+    ):
+        """Obtiene los primeros usuarios cuyo nombre empieza por prefijo"""
+        return self.user_storage.buscar(prefijo, limit, order_by, descending)
+
+    def subscribe_changes(self, callback):
+        """
+        Suscribe callback(cambios) a los cambios de usuarios, incluidos los
+        de otros procesos. Retorna la función para darse de baja.
+        """
+        return ChangeFeed.for_db(self.user_storage.db).subscribe(callback)
+
+    def poll_changes(self):
+        """Entrega ya los cambios pendientes sin esperar al hilo vigía"""
+        return ChangeFeed.for_db(self.user_storage.db).poll()
+
+
+def _subscribe_cache(feed: ChangeFeed, cache: UserCache):
+    """Suscribe la caché al feed sin mantenerla viva.
+
+    Cuando la caché (y su AuthService) se libera, se da de baja sola.
+    """
+    ref = weakref.ref(cache)
+
+    def on_changes(changes):
+        target = ref()
+        if target is None:
+            unsubscribe()
+        else:
+            target.apply_changes(changes)
+    unsubscribe = feed.subscribe(on_changes)
@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from models.user import User
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Contadores de uso de un UserCache."""
+
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+
+
+class UserCache:
+    """Caché LRU con expiración de usuarios indexados por nombre.
+
+    Sólo guarda usuarios encontrados; los nombres inexistentes siempre se
+    consultan. Es seguro usarla desde varios hilos.
+
+    Cada invalidación incrementa una generación. get_or_load descarta lo
+    que cargó si la generación cambió mientras leía, porque la fila pudo
+    leerse antes de la escritura que invalidó la entrada.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: float = 300.0):
+        """
+        Args:
+            max_size: Cantidad máxima de usuarios guardados.
+            ttl: Segundos que un usuario se considera vigente.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, User]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._generation = 0
+
+    def get(self, nombre: str) -> User | None:
+        with self._lock:
+            entry = self._entries.get(nombre)
+            if entry is not None:
+                expires, user = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(nombre)
+                    self._hits += 1
+                    return user
+                del self._entries[nombre]
+                self._expirations += 1
+            self._misses += 1
+            return None
+
+    @property
+    def generation(self) -> int:
+        """Cantidad de invalidaciones hechas; ver put()."""
+        return self._generation
+
+    def put(self, user: User, generation: int | None = None):
+        """Guarda un usuario.
+
+        Args:
+            generation: Valor de `generation` antes de leer el usuario. Si
+                hubo una invalidación desde entonces no se guarda.
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[user.nombre] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user.nombre)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def get_or_load(
+            self,
+            nombre: str,
+            loader: Callable[[str], User | None]
+    ) -> User | None:
+        """Retorna el usuario cacheado o lo carga con loader(nombre)."""
+        user = self.get(nombre)
+        if user is None:
+            generation = self._generation
+            user = loader(nombre)
+            if user is not None:
+                self.put(user, generation)
+        return user
+
+    def invalidate(
+            self,
+            nombres: list[str] | None = None,
+            ids: Iterable[int] = ()
+    ):
+        """Descarta los nombres indicados, o toda la caché si es None.
+
+        Args:
+            ids: Descarta además los usuarios con esos IDs, para cuando
+                no se conoce su nombre anterior (un renombre).
+        """
+        with self._lock:
+            self._generation += 1
+            if nombres is None:
+                self._invalidations += len(self._entries)
+                self._entries.clear()
+                return
+            for nombre in nombres:
+                if self._entries.pop(nombre, None) is not None:
+                    self._invalidations += 1
+            ids = set(ids)
+            if ids:
+                for nombre in [n for n, (_, user) in self._entries.items()
+                               if user.id in ids]:
+                    del self._entries[nombre]
+                    self._invalidations += 1
+
+    def apply_changes(self, changes):
+        """Invalida lo que tocan los cambios de un ChangeFeed.
+
+        Args:
+            changes: Lista de UserChange, o None si se perdieron cambios.
+        """
+        if changes is None:
+            self.invalidate()
+        else:
+            self.invalidate(
+                [change.nombre for change in changes],
+                ids=[change.id for change in changes if change.op == 'update']
+            )
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                size=len(self._entries),
+                max_size=self.max_size,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                invalidations=self._invalidations,
+            )
@@ -0,0 +1,91 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Callable, TypeVar
+
+from models.user import User
+from storage.user_storage import UserStorage
+
+T = TypeVar('T')
+
+
+class AsyncUserStorage:
+    """Fachada asyncio sobre UserStorage.
+
+    Cada llamada se ejecuta en un pool acotado de hilos; cada hilo usa su
+    propia conexión de lectura del pool compartido y las escrituras se
+    serializan en la escritora como en la versión síncrona.
+
+    El número de llamadas en curso (ejecutándose o esperando un hilo) está
+    limitado por `max_pending`: al alcanzarlo, los nuevos llamadores
+    esperan en lugar de encolar trabajo sin límite. Cancelar la tarea que
+    espera una llamada la descarta si todavía no empezó a ejecutarse.
+    """
+
+    def __init__(
+            self,
+            storage: UserStorage | None = None,
+            max_workers: int = 4,
+            max_pending: int = 64
+    ):
+        self.storage = storage or UserStorage()
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='user-storage'
+        )
+        self._slots = asyncio.Semaphore(max_pending)
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Ejecuta fn(*args, **kwargs) en el pool de hilos."""
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, partial(fn, *args, **kwargs)
+            )
+
+    async def get_by_nombre(self, nombre: str) -> User | None:
+        return await self.run(self.storage.get_by_nombre, nombre)
+
+    async def crear_usuario(self, nombre: str, rol: int) -> User:
+        return await self.run(self.storage.crear_usuario, nombre, rol)
+
+    async def crear_usuarios_bulk(self, usuarios, **kwargs) -> int:
+        return await self.run(self.storage.crear_usuarios_bulk, usuarios, **kwargs)
+
+    async def get_all(self) -> list[User]:
+        return await self.run(self.storage.get_all)
+
+    async def iter_page(
+            self,
+            after_id: int | None = None,
+            limit: int | None = None,
+            order_by: str = 'id',
+            descending: bool = False,
+            after: User | None = None
+    ) -> list[User]:
+        return await self.run(
+            self.storage.iter_page, after_id, limit, order_by, descending, after
+        )
+
+    async def iter_all(
+            self,
+            batch_size: int | None = None,
+            order_by: str = 'id',
+            descending: bool = False
+    ) -> AsyncIterator[User]:
+        """Recorre todos los usuarios; cada lote se lee en el pool."""
+        rows_iter = self.storage.iter_rows(batch_size, order_by, descending)
+        while (rows := await self.run(next, rows_iter, None)) is not None:
+            for row in rows:
+                yield User(*row)
+
+    def close(self, wait: bool = True):
+        """Detiene el pool de hilos descartando las llamadas pendientes."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close(wait=False)
@@ -0,0 +1,231 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable
+
+from ui.config.settings import AppSettings
+
+if TYPE_CHECKING:
+    # LocalDB usa MemoryReplica, que a su vez usa ultimo_seq
+    from storage.local_db import LocalDB
+
+
+@dataclass(frozen=True)
+class UserChange:
+    """Un cambio sobre la tabla users.
+
+    Atributos:
+        seq: Número de secuencia, creciente y nunca reutilizado.
+        op: 'insert', 'update' o 'delete'.
+        id: ID del usuario afectado.
+        nombre: Nombre tras el cambio (antes del borrado para 'delete').
+        rol: Rol tras el cambio (antes del borrado para 'delete').
+    """
+
+    seq: int
+    op: str
+    id: int
+    nombre: str
+    rol: int
+
+
+# Un suscriptor recibe los cambios en orden de seq, o None si se perdieron
+# cambios (el registro se compactó antes de leerlos) o son demasiados para
+# aplicarlos uno a uno, y debe recargar todo.
+Subscriber = Callable[[list[UserChange] | None], None]
+
+
+def ultimo_seq(conn: sqlite3.Connection) -> int:
+    """Último seq asignado en users_changelog, o 0 si nunca se anotó nada.
+
+    Se lee de sqlite_sequence, que lo conserva aunque se vacíe el registro.
+    """
+    row = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'users_changelog'"
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def compactar_registro(conn: sqlite3.Connection, retain: int) -> int:
+    """Borra los cambios más antiguos dejando los `retain` más recientes.
+
+    Si el registro no supera `retain` sólo consulta los extremos de la
+    clave primaria, así que se puede llamar tras cada escritura masiva.
+
+    Returns:
+        int: Cambios borrados.
+    """
+    first, last = conn.execute(
+        "SELECT MIN(seq), MAX(seq) FROM users_changelog"
+    ).fetchone()
+    if first is None or last - first < retain:
+        return 0
+    return conn.execute(
+        "DELETE FROM users_changelog WHERE seq <= ?", (last - retain,)
+    ).rowcount
+
+
+class ChangeFeed:
+    """Fuente de cambios de users para refrescar vistas de forma incremental.
+
+    Los triggers de la migración 6 anotan cada cambio en users_changelog.
+    Un hilo vigía consulta PRAGMA data_version en su propia conexión (una
+    lectura que no toca el disco) y sólo cuando cambia lee las filas nuevas
+    del registro, de modo que ve tanto las escrituras de este proceso como
+    las de otros procesos con un retraso de como mucho `poll_interval`.
+
+    El mismo hilo compacta el registro cada `compact_interval` segundos,
+    haya visto cambios o no. Las importaciones masivas, que pueden correr
+    en otro proceso sin ChangeFeed, lo compactan por su cuenta (ver
+    UserStorage.crear_usuarios_bulk).
+    """
+
+    def __init__(
+            self,
+            db: 'LocalDB',
+            poll_interval: float = 0.5,
+            retention: int | None = None,
+            compact_interval: float | None = None,
+            max_batch: int | None = None
+    ):
+        """
+        Args:
+            db: Base de datos a vigilar.
+            poll_interval: Segundos entre consultas de data_version.
+            retention: Cambios que se conservan al compactar el registro.
+                Por defecto AppSettings.CHANGELOG_RETENTION.
+            compact_interval: Segundos entre compactaciones. Por defecto
+                AppSettings.CHANGELOG_COMPACT_INTERVAL.
+            max_batch: Cambios que se entregan como mucho de una vez; si
+                hay más pendientes se entrega None. Por defecto
+                AppSettings.CHANGE_FEED_MAX_BATCH.
+        """
+        self.db = db
+        self.poll_interval = poll_interval
+        self.retention = (AppSettings.CHANGELOG_RETENTION if retention is None
+                          else retention)
+        self.compact_interval = (AppSettings.CHANGELOG_COMPACT_INTERVAL
+                                 if compact_interval is None else compact_interval)
+        self.max_batch = (AppSettings.CHANGE_FEED_MAX_BATCH if max_batch is None
+                          else max_batch)
+        self._lock = threading.Lock()
+        self._subscribers: list[Subscriber] = []
+        # En memoria no hay otros procesos ni conexiones extra: se consulta
+        # el registro directamente con la conexión única del pool.
+        self._memory = db.pool.memory
+        self._conn = None if self._memory else db.pool.connect()
+        self._data_version: int | None = None
+        self.last_seq = self._max_seq()
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+    @classmethod
+    def for_db(cls, db: 'LocalDB', **kwargs) -> 'ChangeFeed':
+        """Fuente compartida y ya iniciada para el archivo de `db`."""
+        feed = db.pool.shared(cls.__name__, lambda: cls(db, **kwargs))
+        feed.start()
+        return feed
+
+    def _query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        if self._conn is not None:
+            return self._conn.execute(sql, params).fetchall()
+        with self.db.reader() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def _max_seq(self) -> int:
+        if self._conn is not None:
+            return ultimo_seq(self._conn)
+        with self.db.reader() as conn:
+            return ultimo_seq(conn)
+
+    def subscribe(self, subscriber: Subscriber) -> Callable[[], None]:
+        """Registra un suscriptor y retorna la función para darlo de baja.
+
+        Los suscriptores se llaman desde el hilo vigía (o desde quien
+        llame a poll()), nunca desde el hilo de Tk.
+        """
+        with self._lock:
+            self._subscribers.append(subscriber)
+
+        def unsubscribe():
+            with self._lock:
+                if subscriber in self._subscribers:
+                    self._subscribers.remove(subscriber)
+        return unsubscribe
+
+    def poll(self) -> list[UserChange] | None:
+        """Lee los cambios nuevos, si los hay, y los entrega a los suscriptores."""
+        with self._lock:
+            if self._conn is not None:
+                version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+                if version == self._data_version:
+                    return []
+                self._data_version = version
+            changes = self.changes_since(self.last_seq, self.max_batch)
+            if changes is None:
+                self.last_seq = self._max_seq()
+            elif changes:
+                self.last_seq = changes[-1].seq
+            else:
+                return []
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber(changes)
+        return changes
+
+    def changes_since(self, seq: int, limit: int | None = None) -> list[UserChange] | None:
+        """Cambios con número de secuencia mayor que `seq`.
+
+        Retorna None si alguno ya se eliminó al compactar el registro o si
+        hay más de `limit`.
+        """
+        rows = self._query(
+            "SELECT seq, op, user_id, nombre, rol FROM users_changelog "
+            "WHERE seq > ? ORDER BY seq LIMIT ?",
+            (seq, -1 if limit is None else limit + 1)
+        )
+        if limit is not None and len(rows) > limit:
+            return None
+        if rows and rows[0][0] != seq + 1:
+            first = self._query("SELECT MIN(seq) FROM users_changelog")[0][0]
+            if first > seq + 1:
+                return None
+        return [UserChange(*row) for row in rows]
+
+    def compactar(self, retain: int | None = None) -> int:
+        """Borra los cambios más antiguos dejando los `retain` más recientes."""
+        retain = self.retention if retain is None else retain
+        return self.db.transaction(lambda conn: compactar_registro(conn, retain))
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name='users-change-feed', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        compact_at = time.monotonic()
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.poll()
+                # Se recorta aunque este proceso no haya escrito: el
+                # registro también crece con las escrituras de otros
+                if time.monotonic() >= compact_at:
+                    compact_at = time.monotonic() + self.compact_interval
+                    self.compactar()
+            except sqlite3.Error:
+                # La base puede estar bloqueada; se reintenta en el siguiente ciclo
+                pass
+
+    def stop(self):
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
@@ -0,0 +1,598 @@
+import atexit
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from urllib.request import pathname2url, url2pathname
+
+from storage.instrumentation import QueryInstrumentation
+from storage.profiles import SQLiteProfile
+from storage.retry import DatabaseBusyError, RetryPolicy, is_busy
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Instantánea de las estadísticas de un pool de conexiones.
+
+    Atributos:
+        database: Ruta absoluta de la base de datos.
+        open: Conexiones abiertas (lectoras vivas más la escritora).
+        in_use: Conexiones prestadas en este momento.
+        readers: Conexiones lectoras abiertas (una por hilo).
+        waits: Veces que se esperó por la conexión escritora.
+        wait_time: Tiempo total de espera por la escritora, en segundos.
+        max_wait: Mayor espera individual por la escritora, en segundos.
+        busy_retries: Transacciones reintentadas porque otro proceso
+            tenía la base bloqueada.
+        busy_failures: Transacciones que agotaron los reintentos.
+        busy_wait: Tiempo total de backoff entre reintentos, en segundos.
+    """
+
+    database: str
+    open: int
+    in_use: int
+    readers: int
+    waits: int
+    wait_time: float
+    max_wait: float
+    busy_retries: int = 0
+    busy_failures: int = 0
+    busy_wait: float = 0.0
+
+
+class ConnectionPool:
+    """Conexiones compartidas a una única base de datos SQLite.
+
+    Cada hilo recibe su propia conexión de lectura, creada la primera vez
+    que la pide y reutilizada después. Las escrituras pasan por una única
+    conexión escritora protegida por un lock, de modo que nunca hay dos
+    transacciones de escritura compitiendo dentro del proceso.
+
+    Todas las conexiones reciben los pragmas del perfil activo; si el
+    perfil pide checkpoints en segundo plano, un hilo aparte los ejecuta
+    para que los commits no tengan que hacerlo.
+
+    Las bases en memoria usan una única conexión para leer y escribir,
+    prestada bajo el mismo lock: cada conexión a ':memory:' es una base
+    distinta, y la caché compartida de SQLite bloquea a los lectores
+    mientras hay una transacción abierta en lugar de dejarlos esperar.
+    """
+
+    def __init__(
+            self,
+            database: str,
+            uri: bool = False,
+            memory: bool = False,
+            read_only: bool = False,
+            connect_options: dict | None = None,
+            instrumentation: QueryInstrumentation | None = None
+    ):
+        """
+        Args:
+            database: Ruta o URI que se pasa a sqlite3.connect.
+            uri: Si `database` es una URI 'file:'.
+            memory: Si es una base en memoria (una sola conexión).
+            read_only: Si la base se abre sólo para lectura; no se migra
+                ni se cambia su journal_mode.
+            connect_options: Argumentos extra para sqlite3.connect, como
+                timeout, detect_types o cached_statements.
+            instrumentation: Si se indica, mide todas las sentencias de
+                las conexiones del pool.
+        """
+        self.database = database
+        self.uri = uri
+        self.memory = memory
+        self.read_only = read_only
+        self.connect_options = dict(connect_options or {})
+        self.instrumentation = instrumentation
+        if instrumentation is not None:
+            self.connect_options['factory'] = instrumentation.connection_factory
+        self._lock = threading.Lock()
+        self._writer_lock = threading.RLock()
+        self._writer: sqlite3.Connection | None = None
+        self._writer_generation = 0
+        self._readers: dict[int, tuple[weakref.ref, sqlite3.Connection, int]] = {}
+        self._initialized = False
+        self._profile: SQLiteProfile | None = None
+        self._profile_lock = threading.Lock()
+        self._generation = 0
+        self._checkpointer: WalCheckpointer | None = None
+        self._write_listeners: list = []
+        self._shared: dict = {}
+        self._creating: dict[str, threading.Lock] = {}
+        self._in_use = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+        self._busy_retries = 0
+        self._busy_failures = 0
+        self._busy_wait = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        # check_same_thread=False permite cerrar las conexiones desde
+        # close()/_prune(); el pool garantiza que cada lectora sólo se usa
+        # desde su hilo y que la escritora se usa bajo _writer_lock.
+        return sqlite3.connect(
+            self.database,
+            uri=self.uri,
+            check_same_thread=False,
+            **self.connect_options
+        )
+
+    def connect(self) -> sqlite3.Connection:
+        """Abre una conexión nueva, fuera del pool, a la misma base.
+
+        No está disponible para bases en memoria, que sólo existen dentro
+        de la conexión del pool.
+        """
+        if self.memory:
+            raise ValueError("Una base en memoria no admite conexiones extra")
+        conn = self._connect()
+        self._configure(conn)
+        return conn
+
+    def _configure(self, conn: sqlite3.Connection):
+        if self._profile is not None:
+            for pragma in self._profile.pragmas():
+                conn.execute(pragma)
+
+    @property
+    def profile(self) -> SQLiteProfile | None:
+        return self._profile
+
+    def adopt_profile(
+            self,
+            profile: SQLiteProfile | None,
+            default: SQLiteProfile
+    ) -> SQLiteProfile:
+        """Perfil con el que trabaja un LocalDB nuevo sobre este pool.
+
+        El primero fija el perfil (`profile`, o `default` si no pide
+        ninguno) y los siguientes sin perfil usan ese mismo. Como el perfil
+        afecta a todas las conexiones compartidas, pedir otro distinto con
+        el pool ya abierto lanza ValueError en lugar de cambiar en silencio
+        la durabilidad de los demás; para cambiarlo a propósito está
+        use_profile().
+        """
+        with self._profile_lock:
+            current = self._profile
+            if current is None:
+                self.use_profile(profile or default)
+                return self._profile
+            if profile is not None and profile != current:
+                raise ValueError(
+                    f"La base {self.database} ya está abierta con el perfil "
+                    f"{current.name!r}; no se puede abrir con {profile.name!r}"
+                )
+            return current
+
+    def use_profile(self, profile: SQLiteProfile):
+        """Activa un perfil de pragmas para todas las conexiones del pool.
+
+        Las conexiones ya abiertas lo aplican la próxima vez que se prestan.
+        """
+        with self._lock:
+            if profile == self._profile:
+                return
+            self._profile = profile
+            self._generation += 1
+        if self.memory or self.read_only:
+            return
+        # journal_mode es persistente en el archivo: basta con la escritora
+        with self.writer() as conn:
+            conn.commit()
+            conn.execute(f"PRAGMA journal_mode = {profile.journal_mode}")
+        self._restart_checkpointer()
+
+    def _restart_checkpointer(self):
+        with self._lock:
+            old, self._checkpointer = self._checkpointer, None
+            interval = self._profile and self._profile.checkpoint_interval
+            if interval:
+                self._checkpointer = WalCheckpointer(self, interval)
+                self._checkpointer.start()
+        if old is not None:
+            old.stop()
+
+    def _prune(self):
+        """Cierra las lectoras de hilos que ya terminaron. Requiere _lock."""
+        for ident, (thread_ref, conn, _) in list(self._readers.items()):
+            thread = thread_ref()
+            if thread is None or not thread.is_alive():
+                del self._readers[ident]
+                conn.close()
+
+    def _reader_connection(self) -> sqlite3.Connection:
+        ident = threading.get_ident()
+        entry = self._readers.get(ident)
+        if entry is not None and entry[0]() is threading.current_thread():
+            thread_ref, conn, generation = entry
+            if generation != self._generation:
+                self._configure(conn)
+                self._readers[ident] = (thread_ref, conn, self._generation)
+            return conn
+        with self._lock:
+            self._prune()
+            conn = self._connect()
+            generation = self._generation
+            self._readers[ident] = (
+                weakref.ref(threading.current_thread()), conn, generation
+            )
+        self._configure(conn)
+        return conn
+
+    def _writer_connection(self) -> sqlite3.Connection:
+        """Conexión escritora configurada. Requiere _writer_lock."""
+        if self._writer is None:
+            self._writer = self._connect()
+            self._writer_generation = -1
+        if self._writer_generation != self._generation:
+            self._configure(self._writer)
+            self._writer_generation = self._generation
+        return self._writer
+
+    def connection(self) -> sqlite3.Connection:
+        """Retorna la conexión de lectura del hilo actual sin contabilizarla."""
+        if self.memory:
+            with self._writer_lock:
+                return self._writer_connection()
+        return self._reader_connection()
+
+    @contextmanager
+    def reader(self):
+        """Presta la conexión de lectura del hilo actual."""
+        if self.memory:
+            with self._writer_lock:
+                with self._lock:
+                    self._in_use += 1
+                try:
+                    yield self._writer_connection()
+                finally:
+                    with self._lock:
+                        self._in_use -= 1
+            return
+        conn = self._reader_connection()
+        with self._lock:
+            self._in_use += 1
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                self._in_use -= 1
+
+    @contextmanager
+    def writer(self, immediate: bool = False):
+        """Presta la conexión escritora dentro de una transacción.
+
+        Hace commit al salir del bloque y rollback si se produce una
+        excepción.
+
+        Args:
+            immediate: Abre la transacción con BEGIN IMMEDIATE, que toma
+                el lock de escritura al empezar. Así la espera por otro
+                proceso ocurre antes de ejecutar nada y queda cubierta
+                por busy_timeout, en lugar de fallar al promover un
+                lock de lectura a mitad de la transacción.
+        """
+        start = time.perf_counter()
+        self._writer_lock.acquire()
+        waited = time.perf_counter() - start
+        try:
+            with self._lock:
+                self._in_use += 1
+                self._waits += 1
+                self._wait_time += waited
+                self._max_wait = max(self._max_wait, waited)
+            conn = self._writer_connection()
+            try:
+                if immediate and not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE")
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                with self._lock:
+                    self._in_use -= 1
+        finally:
+            self._writer_lock.release()
+
+    def run_in_transaction(self, fn, retry: RetryPolicy | None = None):
+        """Ejecuta fn(conn) en una transacción BEGIN IMMEDIATE y la confirma.
+
+        Si otro proceso mantiene la base bloqueada más allá de
+        busy_timeout, la transacción se revierte y se reintenta completa
+        según `retry`, así que fn debe poder ejecutarse más de una vez.
+        La espera entre intentos ocurre sin retener la escritora.
+
+        Returns:
+            Lo que retorne fn.
+
+        Raises:
+            DatabaseBusyError: Si la base siguió bloqueada en todos los
+                intentos.
+        """
+        retry = retry or RetryPolicy()
+        for attempt in range(1, retry.attempts + 1):
+            try:
+                with self.writer(immediate=True) as conn:
+                    return fn(conn)
+            except sqlite3.OperationalError as e:
+                if not is_busy(e):
+                    raise
+                if attempt == retry.attempts:
+                    with self._lock:
+                        self._busy_failures += 1
+                    raise DatabaseBusyError(
+                        "La base de datos está ocupada por otro proceso; "
+                        "inténtalo de nuevo en unos segundos"
+                    ) from e
+                delay = retry.delay(attempt)
+                with self._lock:
+                    self._busy_retries += 1
+                    self._busy_wait += delay
+                time.sleep(delay)
+
+    def data_version(self) -> int:
+        """PRAGMA data_version de la escritora.
+
+        Cambia sólo cuando otra conexión (en la práctica, otro proceso)
+        confirma cambios, porque todas las escrituras del proceso pasan
+        por la escritora.
+        """
+        with self._writer_lock:
+            conn = self._writer_connection()
+            return conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def shared(self, key: str, factory):
+        """Objeto único por pool, creado con factory() la primera vez.
+
+        factory() corre una sola vez por clave aunque varios hilos pidan
+        el objeto a la vez: los demás esperan a que termine, así no se
+        crean objetos de más (algunos arrancan hilos propios).
+        """
+        with self._lock:
+            if key in self._shared:
+                return self._shared[key]
+            creating = self._creating.setdefault(key, threading.Lock())
+        # factory() puede volver a usar el pool, así que corre sin _lock
+        with creating:
+            with self._lock:
+                if key in self._shared:
+                    return self._shared[key]
+            value = factory()
+            with self._lock:
+                self._shared[key] = value
+                self._creating.pop(key, None)
+            return value
+
+    def add_write_listener(self, listener):
+        """Registra listener(nombres) para después de cada escritura.
+
+        `nombres` es la lista de nombres de usuario afectados, o None si no
+        se conocen. Los métodos ligados se guardan con referencia débil
+        para no mantener vivos a sus objetos (por ejemplo, el AuthService
+        de una ventana ya cerrada).
+        """
+        if hasattr(listener, '__self__'):
+            ref = weakref.WeakMethod(listener)
+        else:
+            ref = lambda: listener  # noqa: E731
+        with self._lock:
+            self._write_listeners.append(ref)
+
+    def notify_write(self, nombres: list[str] | None = None):
+        """Avisa a los listeners de que se confirmó una escritura.
+
+        La escritura ya está confirmada: si un listener falla se registra
+        el error y se sigue con los demás, en lugar de hacer fallar a quien
+        escribió (o terminar el hilo de la cola de escritura).
+        """
+        with self._lock:
+            refs = list(self._write_listeners)
+        dead = []
+        for ref in refs:
+            listener = ref()
+            if listener is None:
+                dead.append(ref)
+                continue
+            try:
+                listener(nombres)
+            except Exception:
+                logger.exception("Falló un listener de escritura de %s", self.database)
+        if dead:
+            with self._lock:
+                self._write_listeners = [
+                    ref for ref in self._write_listeners if ref not in dead
+                ]
+
+    def initialize(self, init):
+        """Ejecuta init(conn) con la escritora una única vez por pool.
+
+        En bases de sólo lectura no se ejecuta.
+        """
+        if self._initialized or self.read_only:
+            return
+        with self.writer() as conn:
+            if not self._initialized:
+                init(conn)
+                self._initialized = True
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            self._prune()
+            readers = len(self._readers)
+            return PoolStats(
+                database=self.database,
+                open=readers + (1 if self._writer is not None else 0),
+                in_use=self._in_use,
+                readers=readers,
+                waits=self._waits,
+                wait_time=self._wait_time,
+                max_wait=self._max_wait,
+                busy_retries=self._busy_retries,
+                busy_failures=self._busy_failures,
+                busy_wait=self._busy_wait,
+            )
+
+    def close(self):
+        """Cierra todas las conexiones del pool."""
+        with self._lock:
+            checkpointer, self._checkpointer = self._checkpointer, None
+            shared = list(self._shared.values())
+            self._shared.clear()
+        if checkpointer is not None:
+            checkpointer.stop()
+        if self.instrumentation is not None:
+            self.instrumentation.stop()
+        # Los objetos compartidos con hilos propios (p. ej. ChangeFeed)
+        for value in shared:
+            stop = getattr(value, 'stop', None)
+            if stop is not None:
+                stop()
+        with self._writer_lock, self._lock:
+            for _, conn, _ in self._readers.values():
+                conn.close()
+            self._readers.clear()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            self._initialized = False
+
+
+class WalCheckpointer(threading.Thread):
+    """Hilo que ejecuta checkpoints PASSIVE del WAL a intervalos fijos.
+
+    Un checkpoint PASSIVE copia al archivo principal todo lo que pueda sin
+    esperar a lectores ni escritores, de modo que nunca bloquea a nadie.
+    """
+
+    def __init__(self, pool: ConnectionPool, interval: float):
+        super().__init__(name=f"wal-checkpoint:{pool.database}", daemon=True)
+        self.pool = pool
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        conn = self.pool.connect()
+        try:
+            while not self._stop_event.wait(self.interval):
+                try:
+                    conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+                except sqlite3.Error:
+                    # Se reintenta en el siguiente intervalo
+                    pass
+        finally:
+            conn.close()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive() and self is not threading.current_thread():
+            self.join()
+
+
+class ConnectionManager:
+    """Registro de pools compartido por todo el proceso.
+
+    Mantiene un ConnectionPool por archivo de base de datos, de modo que
+    todas las instancias de LocalDB que apuntan al mismo archivo comparten
+    conexiones en lugar de abrir las suyas.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools: dict[str, ConnectionPool] = {}
+        self._memory_ids = itertools.count(1)
+
+    def get_pool(
+            self,
+            database: str,
+            uri: bool = False,
+            read_only: bool = False,
+            connect_options: dict | None = None,
+            instrumentation: QueryInstrumentation | None = None
+    ) -> ConnectionPool:
+        """Pool para `database`, creado la primera vez que se pide.
+
+        Args:
+            database: Ruta del archivo, ':memory:' o una URI 'file:'.
+            uri: Si `database` es una URI. Admite las opciones de SQLite
+                como mode=ro o mode=memory&cache=shared. Las URI de un
+                archivo comparten pool con su ruta, así que sus opciones
+                sólo se usan al crear el pool.
+            read_only: Abre un archivo con mode=ro. Las bases de sólo
+                lectura tienen un pool aparte, sin escritora.
+            connect_options: Argumentos extra para sqlite3.connect. Sólo
+                se usan al crear el pool.
+            instrumentation: Medición de sentencias. Sólo se usa al crear
+                el pool.
+        """
+        memory = False
+        if database == ':memory:':
+            # Cada ':memory:' es una base nueva, como en sqlite3.connect
+            key = f":memory:#{next(self._memory_ids)}"
+            memory = True
+        else:
+            options = {}
+            path = database
+            if uri:
+                parts = urlsplit(database)
+                options = dict(parse_qsl(parts.query))
+                path = url2pathname(parts.path)
+                memory = options.get('mode') == 'memory' or path == ':memory:'
+            if memory:
+                # Una URI en memoria se identifica por su nombre y opciones
+                key = database
+            else:
+                path = os.path.abspath(path)
+                read_only = read_only or options.get('mode') == 'ro'
+                # El mismo archivo usa un solo pool aunque se nombre de
+                # otra forma, para que haya una sola escritora y un solo
+                # juego de listeners
+                key = path
+                if read_only:
+                    options['mode'] = 'ro'
+                    key = f"file:{pathname2url(path)}?mode=ro"
+                if options:
+                    database = f"file:{pathname2url(path)}?{urlencode(options)}"
+                    uri = True
+                else:
+                    database = path
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(
+                    database,
+                    uri=uri,
+                    memory=memory,
+                    read_only=read_only,
+                    connect_options=connect_options,
+                    instrumentation=instrumentation
+                )
+                self._pools[key] = pool
+            return pool
+
+    def stats(self) -> list[PoolStats]:
+        with self._lock:
+            pools = list(self._pools.values())
+        return [pool.stats() for pool in pools]
+
+    def close_all(self):
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.close()
+
+
+connection_manager = ConnectionManager()
+atexit.register(connection_manager.close_all)
@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(sql: str) -> str:
+    """Forma canónica de una sentencia para agrupar sus mediciones.
+
+    Colapsa espacios y reemplaza literales y listas de parámetros por '?',
+    de modo que 'IN (?, ?, ?)' y 'IN (?, ?)' cuentan como la misma consulta.
+    """
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _SPACES.sub(' ', sql).strip()
+    return _IN_LIST.sub('(?, ...)', sql)
+
+
+@dataclass(frozen=True)
+class StatementStats:
+    """Tiempos de una sentencia normalizada, en milisegundos."""
+
+    statement: str
+    count: int
+    total_ms: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class _Statement:
+    __slots__ = ('count', 'total', 'max', 'samples')
+
+    def __init__(self, max_samples: int):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: deque[float] = deque(maxlen=max_samples)
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class QueryInstrumentation:
+    """Mide las sentencias ejecutadas por las conexiones de un pool.
+
+    Por cada sentencia normalizada guarda cantidad, tiempo total, máximo y
+    las últimas `max_samples` duraciones para estimar p50/p95/p99. Las
+    que superan `slow_query_ms` se registran en el logger
+    'storage.instrumentation' junto con su EXPLAIN QUERY PLAN.
+
+    El tiempo medido es el de execute(): incluye preparar la sentencia y
+    obtener la primera fila (donde SQLite hace ordenamientos y búsquedas),
+    no el de recorrer el resto de un cursor.
+    """
+
+    def __init__(self, slow_query_ms: float = 100.0, max_samples: int = 1000):
+        self.slow_query_ms = slow_query_ms
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._statements: dict[str, _Statement] = {}
+        self._dumper: StatsDumper | None = None
+        self.connection_factory = self._make_factory()
+
+    def _make_factory(self):
+        instrumentation = self
+
+        class InstrumentedConnection(sqlite3.Connection):
+            def execute(self, sql, parameters=(), /):
+                start = time.perf_counter()
+                try:
+                    return super().execute(sql, parameters)
+                finally:
+                    instrumentation.record(
+                        self, sql, parameters, time.perf_counter() - start
+                    )
+
+            def executemany(self, sql, seq_of_parameters, /):
+                start = time.perf_counter()
+                try:
+                    return super().executemany(sql, seq_of_parameters)
+                finally:
+                    instrumentation.record(
+                        self, sql, None, time.perf_counter() - start
+                    )
+
+        return InstrumentedConnection
+
+    def record(self, conn, sql: str, parameters, elapsed: float):
+        key = normalize(sql)
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                stats = self._statements[key] = _Statement(self.max_samples)
+            stats.count += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            stats.samples.append(elapsed)
+        if elapsed * 1000 >= self.slow_query_ms:
+            self._log_slow(conn, sql, parameters, elapsed)
+
+    def _log_slow(self, conn, sql: str, parameters, elapsed: float):
+        plan = ''
+        if parameters is not None and not sql.lstrip().upper().startswith(
+                ('PRAGMA', 'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE')):
+            try:
+                # Se usa la clase base para no medir el propio EXPLAIN
+                rows = sqlite3.Connection.execute(
+                    conn, 'EXPLAIN QUERY PLAN ' + sql, parameters
+                ).fetchall()
+                plan = '\n'.join(f"  {row[3]}" for row in rows)
+            except sqlite3.Error as e:
+                plan = f"  (sin plan: {e})"
+        logger.warning(
+            "Consulta lenta (%.1f ms): %s\n%s",
+            elapsed * 1000, _SPACES.sub(' ', sql).strip(), plan
+        )
+
+    def snapshot(self) -> list[StatementStats]:
+        """Estadísticas actuales, de mayor a menor tiempo total."""
+        with self._lock:
+            items = [
+                (key, s.count, s.total, s.max, sorted(s.samples))
+                for key, s in self._statements.items()
+            ]
+        result = [
+            StatementStats(
+                statement=key,
+                count=count,
+                total_ms=total * 1000,
+                mean_ms=total / count * 1000,
+                p50_ms=_percentile(ordered, 0.50) * 1000,
+                p95_ms=_percentile(ordered, 0.95) * 1000,
+                p99_ms=_percentile(ordered, 0.99) * 1000,
+                max_ms=maximum * 1000,
+            )
+            for key, count, total, maximum, ordered in items
+        ]
+        return sorted(result, key=lambda s: s.total_ms, reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+
+    def dump(self, path: str):
+        """Escribe snapshot() como JSON, reemplazando el archivo de forma atómica."""
+        data = {
+            'timestamp': time.time(),
+            'statements': [asdict(s) for s in self.snapshot()],
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def start_dumping(self, path: str, interval: float):
+        """Vuelca las estadísticas a `path` cada `interval` segundos."""
+        self.stop()
+        self._dumper = StatsDumper(self, path, interval)
+        self._dumper.start()
+
+    def stop(self):
+        if self._dumper is not None:
+            self._dumper.stop()
+            self._dumper = None
+
+
+class StatsDumper(threading.Thread):
+    """Hilo que vuelca periódicamente las estadísticas a un archivo."""
+
+    def __init__(self, instrumentation: QueryInstrumentation, path: str, interval: float):
+        super().__init__(name='query-stats-dump', daemon=True)
+        self.instrumentation = instrumentation
+        self.path = path
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.instrumentation.dump(self.path)
+            except OSError:
+                logger.exception("No se pudieron volcar las estadísticas")
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive() and self is not threading.current_thread():
+            self.join()
+        # Último volcado para no perder lo medido desde el anterior
+        try:
+            self.instrumentation.dump(self.path)
+        except OSError:
+            logger.exception("No se pudieron volcar las estadísticas")
@@ -1,17 +1,158 @@
 import sqlite3
 
+from storage.connection_pool import connection_manager
+from storage.instrumentation import QueryInstrumentation, StatementStats
+from storage.migrations import migrar
+from storage.profiles import SQLiteProfile, get_profile
+from storage.replica import MemoryReplica
+from storage.retry import RetryPolicy
+from ui.config.settings import AppSettings
+
 
 class LocalDB:
-    def __init__(self):
-        self.conn = sqlite3.connect('app.db')
-        self.crear_tablas()
-
-    def crear_tablas(self):
-        self.conn.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY,
-            nombre TEXT NOT NULL,
-            rol INTEGER NOT NULL
+    """Acceso a la base de datos local a través del pool compartido.
+
+    Crear un LocalDB no abre conexiones nuevas: todas las instancias que
+    apuntan al mismo archivo comparten el pool del proceso, y el esquema
+    se migra sólo la primera vez que se usa ese pool.
+
+    El perfil de rendimiento (ver storage.profiles) se elige por nombre o
+    se toma de AppSettings.DATABASE_PROFILE. Es del pool y no de cada
+    instancia: un LocalDB sin perfil usa el que ya tenga el pool, y pedir
+    otro distinto sobre un pool abierto lanza ValueError.
+
+    Las escrituras que pasan por transaction() esperan el lock de otros
+    procesos hasta busy_timeout y después se reintentan según la política
+    de reintentos.
+    """
+
+    def __init__(
+            self,
+            database: str | None = None,
+            profile: str | SQLiteProfile | None = None,
+            uri: bool = False,
+            read_only: bool = False,
+            connect_options: dict | None = None,
+            replica: bool | None = None,
+            max_staleness: float | None = None,
+            instrument: bool | None = None,
+            busy_timeout: int | None = None,
+            retry: RetryPolicy | None = None
+    ):
+        """
+        Args:
+            database: Ruta del archivo, ':memory:' o una URI 'file:'. Por
+                defecto AppSettings.DATABASE_PATH.
+            profile: Perfil de rendimiento o su nombre. Por defecto el
+                del pool si ya está abierto, o AppSettings.DATABASE_PROFILE.
+            uri: Si `database` es una URI, por ejemplo
+                'file:bench?mode=memory&cache=shared' o 'file:app.db?mode=ro'.
+            read_only: Abre el archivo en modo de sólo lectura.
+            connect_options: Argumentos extra para sqlite3.connect.
+            replica: Si las lecturas se sirven desde una réplica en memoria
+                (ver MemoryReplica). Por defecto AppSettings.DATABASE_REPLICA.
+                No aplica a bases en memoria.
+            max_staleness: Antigüedad máxima de la réplica, en segundos.
+                Por defecto AppSettings.REPLICA_MAX_STALENESS.
+            instrument: Si se miden las sentencias (ver
+                QueryInstrumentation). Por defecto
+                AppSettings.QUERY_INSTRUMENTATION. Como las conexiones se
+                comparten, sólo tiene efecto para el primer LocalDB de
+                cada base.
+            busy_timeout: Milisegundos que SQLite espera a que otro
+                proceso libere la base. Por defecto
+                AppSettings.DATABASE_BUSY_TIMEOUT. Como connect_options,
+                sólo se usa al crear el pool.
+            retry: Reintentos de transaction(). Por defecto se arma con
+                AppSettings.WRITE_RETRY_*.
+        """
+        if instrument is None:
+            instrument = AppSettings.QUERY_INSTRUMENTATION
+        instrumentation = QueryInstrumentation(
+            slow_query_ms=AppSettings.SLOW_QUERY_MS
+        ) if instrument else None
+        if busy_timeout is None:
+            busy_timeout = AppSettings.DATABASE_BUSY_TIMEOUT
+        connect_options = {'timeout': busy_timeout / 1000, **(connect_options or {})}
+        self.retry = retry or RetryPolicy(
+            attempts=AppSettings.WRITE_RETRY_ATTEMPTS,
+            base_delay=AppSettings.WRITE_RETRY_BASE_DELAY,
+            max_delay=AppSettings.WRITE_RETRY_MAX_DELAY
         )
-        ''')
-        self.conn.commit()
\ No newline at end of file
+        self.pool = connection_manager.get_pool(
+            database or AppSettings.DATABASE_PATH,
+            uri=uri,
+            read_only=read_only,
+            connect_options=connect_options,
+            instrumentation=instrumentation
+        )
+        # Sólo el LocalDB que creó el pool pone en marcha el volcado
+        if (instrumentation is not None and AppSettings.QUERY_STATS_PATH
+                and self.pool.instrumentation is instrumentation):
+            instrumentation.start_dumping(
+                AppSettings.QUERY_STATS_PATH,
+                AppSettings.QUERY_STATS_INTERVAL
+            )
+        self.profile = self.pool.adopt_profile(
+            get_profile(profile) if profile else None,
+            get_profile(AppSettings.DATABASE_PROFILE)
+        )
+        self.pool.initialize(migrar)
+
+        if replica is None:
+            replica = AppSettings.DATABASE_REPLICA
+        self.replica = MemoryReplica.for_pool(
+            self.pool,
+            max_staleness=(AppSettings.REPLICA_MAX_STALENESS
+                           if max_staleness is None else max_staleness)
+        ) if replica and not self.pool.memory else None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Conexión de lectura del hilo actual."""
+        if self.replica is not None:
+            return self.replica.connection()
+        return self.pool.connection()
+
+    def reader(self):
+        """Context manager con la conexión de lectura del hilo actual.
+
+        Con réplica, presta la conexión de la réplica en memoria.
+        """
+        if self.replica is not None:
+            return self.replica.reader()
+        return self.pool.reader()
+
+    def writer(self):
+        """Context manager con la conexión escritora en una transacción."""
+        return self.pool.writer()
+
+    def transaction(self, fn):
+        """Ejecuta fn(conn) en una transacción de escritura con reintentos.
+
+        Ver ConnectionPool.run_in_transaction: fn puede ejecutarse más de
+        una vez y, si la base sigue bloqueada, se lanza DatabaseBusyError.
+        """
+        return self.pool.run_in_transaction(fn, self.retry)
+
+    def add_write_listener(self, listener):
+        """Registra listener(nombres) para las escrituras en esta base."""
+        self.pool.add_write_listener(listener)
+
+    def notify_write(self, nombres: list[str] | None = None):
+        """Avisa de una escritura confirmada a todos los listeners."""
+        self.pool.notify_write(nombres)
+
+    def data_version(self) -> int:
+        """Versión que cambia cuando otro proceso modifica la base."""
+        return self.pool.data_version()
+
+    def stats(self):
+        """Estadísticas del pool de conexiones de esta base de datos."""
+        return self.pool.stats()
+
+    def query_stats(self) -> list[StatementStats]:
+        """Tiempos por sentencia, si la base está instrumentada."""
+        if self.pool.instrumentation is None:
+            return []
+        return self.pool.instrumentation.snapshot()
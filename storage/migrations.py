@@ -0,0 +1,145 @@
+import sqlite3
+
+# Cada migración es (versión, sentencias). La versión aplicada se guarda en
+# PRAGMA user_version, así que una base al día sólo cuesta leer ese pragma.
+MIGRATIONS: list[tuple[int, tuple[str, ...]]] = [
+    (1, (
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            nombre TEXT NOT NULL,
+            rol INTEGER NOT NULL
+        )
+        ''',
+    )),
+    (2, (
+        # Antes no había restricción de unicidad y el login siempre tomaba
+        # la primera fila, así que las duplicadas eran inalcanzables.
+        '''
+        DELETE FROM users
+        WHERE id NOT IN (SELECT MIN(id) FROM users GROUP BY nombre)
+        ''',
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_users_nombre ON users (nombre)",
+    )),
+    (3, (
+        "CREATE INDEX IF NOT EXISTS idx_users_rol_nombre ON users (rol, nombre)",
+    )),
+    (4, (
+        # Búsqueda por prefijo sin distinguir mayúsculas (UserStorage.buscar)
+        '''
+        CREATE INDEX IF NOT EXISTS idx_users_nombre_nocase
+        ON users (nombre COLLATE NOCASE)
+        ''',
+    )),
+    (5, (
+        # Conteos por rol mantenidos por triggers (UserStorage.count*)
+        '''
+        CREATE TABLE IF NOT EXISTS users_stats (
+            rol INTEGER PRIMARY KEY,
+            total INTEGER NOT NULL
+        )
+        ''',
+        '''
+        INSERT INTO users_stats (rol, total)
+        SELECT rol, COUNT(*) FROM users GROUP BY rol
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS users_stats_insert
+        AFTER INSERT ON users
+        BEGIN
+            INSERT INTO users_stats (rol, total) VALUES (NEW.rol, 1)
+            ON CONFLICT (rol) DO UPDATE SET total = total + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS users_stats_delete
+        AFTER DELETE ON users
+        BEGIN
+            UPDATE users_stats SET total = total - 1 WHERE rol = OLD.rol;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS users_stats_update
+        AFTER UPDATE OF rol ON users
+        WHEN OLD.rol <> NEW.rol
+        BEGIN
+            UPDATE users_stats SET total = total - 1 WHERE rol = OLD.rol;
+            INSERT INTO users_stats (rol, total) VALUES (NEW.rol, 1)
+            ON CONFLICT (rol) DO UPDATE SET total = total + 1;
+        END
+        ''',
+    )),
+    (6, (
+        # Registro de cambios para storage.change_feed. AUTOINCREMENT
+        # garantiza que seq nunca se reutiliza, aunque se borren filas.
+        '''
+        CREATE TABLE IF NOT EXISTS users_changelog (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            op TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            nombre TEXT,
+            rol INTEGER
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS users_changelog_insert
+        AFTER INSERT ON users
+        BEGIN
+            INSERT INTO users_changelog (op, user_id, nombre, rol)
+            VALUES ('insert', NEW.id, NEW.nombre, NEW.rol);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS users_changelog_update
+        AFTER UPDATE ON users
+        BEGIN
+            INSERT INTO users_changelog (op, user_id, nombre, rol)
+            VALUES ('update', NEW.id, NEW.nombre, NEW.rol);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS users_changelog_delete
+        AFTER DELETE ON users
+        BEGIN
+            INSERT INTO users_changelog (op, user_id, nombre, rol)
+            VALUES ('delete', OLD.id, OLD.nombre, OLD.rol);
+        END
+        ''',
+    )),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrar(conn: sqlite3.Connection) -> int:
+    """Aplica las migraciones pendientes y retorna la versión resultante.
+
+    Todas las migraciones pendientes se aplican en una sola transacción
+    BEGIN IMMEDIATE, de modo que dos procesos que arrancan a la vez no las
+    ejecutan dos veces y un fallo deja el esquema como estaba.
+    """
+    version = get_version(conn)
+    if version >= SCHEMA_VERSION:
+        return version
+
+    conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Otro proceso pudo migrar mientras esperábamos el lock
+        version = get_version(conn)
+        for target, statements in MIGRATIONS:
+            if target <= version:
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {target}")
+            version = target
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return version
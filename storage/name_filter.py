@@ -0,0 +1,265 @@
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+
+from storage.change_feed import ultimo_seq
+from storage.local_db import LocalDB
+
+
+class BloomFilter:
+    """Filtro de Bloom sobre cadenas.
+
+    Responde "quizás está" o "seguro que no está": nunca da falsos
+    negativos y los falsos positivos se mantienen cerca de
+    `false_positive_rate` mientras no se superen `capacity` elementos.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01):
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate debe estar entre 0 y 1")
+        self.capacity = max(capacity, 1)
+        self.false_positive_rate = false_positive_rate
+        self.num_bits = math.ceil(
+            -self.capacity * math.log(false_positive_rate) / math.log(2) ** 2
+        )
+        self.num_hashes = max(
+            1, round(self.num_bits / self.capacity * math.log(2))
+        )
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        # Doble hashing: k posiciones a partir de dos hashes de 64 bits
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7))
+            for pos in self._positions(item)
+        )
+
+    @property
+    def saturated(self) -> bool:
+        return self.count > self.capacity
+
+
+class NameFilter:
+    """Filtro de pertenencia de todos los nombres de usuario de una base.
+
+    Hay uno por base de datos en el proceso (ver for_db). Se construye en
+    segundo plano la primera vez que se consulta y se mantiene al día con
+    los avisos de escritura de UserStorage. Cuando otra conexión modifica
+    la base (detectado con PRAGMA data_version en una conexión propia, sin
+    tocar la escritora) incorpora los nombres nuevos leyendo
+    users_changelog; sólo se reconstruye entero si se satura o si el
+    registro se compactó antes de leerlo.
+
+    Mientras no está al día responde "quizás", así que el login consulta
+    SQLite en lugar de esperar a la reconstrucción.
+
+    Lee siempre del archivo y no de la réplica en memoria (ver
+    MemoryReplica): la réplica puede ir atrasada respecto de la versión
+    que se anota.
+    """
+
+    def __init__(
+            self,
+            db: LocalDB,
+            false_positive_rate: float = 0.01,
+            recheck_interval: float = 1.0
+    ):
+        """
+        Args:
+            db: Base de datos cuyos nombres se filtran.
+            false_positive_rate: Tasa de falsos positivos buscada.
+            recheck_interval: Segundos mínimos entre comprobaciones de
+                escrituras de otras conexiones.
+        """
+        self.db = db
+        self.false_positive_rate = false_positive_rate
+        self.recheck_interval = recheck_interval
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._bloom: BloomFilter | None = None
+        self._stale = False
+        self._pending: list[str] | None = None
+        # En memoria no hay otras conexiones que puedan escribir
+        self._conn = None if db.pool.memory else db.pool.connect()
+        self._conn_lock = threading.Lock()
+        self._data_version: int | None = None
+        self._last_seq = 0
+        self._checked_at = 0.0
+        self._worker: threading.Thread | None = None
+        self.rebuilds = 0
+        self.rejections = 0
+        db.add_write_listener(self._on_write)
+
+    @classmethod
+    def for_db(cls, db: LocalDB, **kwargs) -> 'NameFilter':
+        """Filtro compartido por todos los LocalDB del mismo archivo."""
+        return db.pool.shared(cls.__name__, lambda: cls(db, **kwargs))
+
+    def might_contain(self, nombre: str) -> bool:
+        """False si el nombre seguro que no existe en la base."""
+        if self._foreign_write():
+            self._stale = True
+        bloom = self._bloom
+        if bloom is None or bloom.saturated or self._stale:
+            self._refresh_in_background()
+            return True
+        if nombre in bloom:
+            return True
+        self.rejections += 1
+        return False
+
+    def rebuild(self) -> BloomFilter:
+        """Reconstruye el filtro recorriendo el índice de nombres."""
+        with self._rebuild_lock:
+            return self._rebuild()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Espera a que termine la actualización en segundo plano.
+
+        Returns:
+            bool: False si sigue en curso al agotarse `timeout`.
+        """
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+            return not worker.is_alive()
+        return True
+
+    def stop(self):
+        self.wait()
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(
+                target=self._refresh, name='name-filter', daemon=True
+            )
+            self._worker.start()
+
+    def _refresh(self):
+        try:
+            with self._rebuild_lock:
+                while True:
+                    bloom = self._bloom
+                    if bloom is None or bloom.saturated:
+                        self._rebuild()
+                    elif self._stale:
+                        self._catch_up(bloom)
+                    else:
+                        return
+        except sqlite3.Error:
+            # Sigue desactualizado y respondiendo "quizás"; la próxima
+            # consulta lo reintenta
+            pass
+
+    def _rebuild(self) -> BloomFilter:
+        """Requiere _rebuild_lock."""
+        with self._lock:
+            self._pending = []
+            self._stale = False
+        try:
+            # La versión y el último cambio se leen antes de recorrer: lo
+            # que se escriba durante el recorrido se incorpora después
+            # desde el registro.
+            version = self._read_version()
+            with self.db.pool.reader() as conn:
+                last_seq = ultimo_seq(conn)
+                total = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+                bloom = BloomFilter(
+                    max(2 * total, 1024), self.false_positive_rate
+                )
+                cursor = conn.execute("SELECT nombre FROM users")
+                while rows := cursor.fetchmany(10000):
+                    for (nombre,) in rows:
+                        bloom.add(nombre)
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            for nombre in self._pending:
+                bloom.add(nombre)
+            self._pending = None
+            self._bloom = bloom
+            self._data_version = version
+            self._last_seq = last_seq
+            self._checked_at = time.monotonic()
+            self.rebuilds += 1
+        return bloom
+
+    def _catch_up(self, bloom: BloomFilter):
+        """Agrega los nombres anotados en el registro desde la última lectura.
+
+        Requiere _rebuild_lock.
+        """
+        with self._lock:
+            self._stale = False
+        version = self._read_version()
+        with self.db.pool.reader() as conn:
+            last_seq = ultimo_seq(conn)
+            nombres = []
+            if last_seq > self._last_seq:
+                first = conn.execute(
+                    "SELECT MIN(seq) FROM users_changelog"
+                ).fetchone()[0]
+                if first is None or first > self._last_seq + 1:
+                    # Se compactó antes de leerlo: hay que recorrer todo
+                    with self._lock:
+                        self._bloom = None
+                    return
+                nombres = [nombre for (nombre,) in conn.execute(
+                    "SELECT nombre FROM users_changelog "
+                    "WHERE seq > ? AND seq <= ? AND op != 'delete'",
+                    (self._last_seq, last_seq)
+                )]
+        with self._lock:
+            for nombre in nombres:
+                bloom.add(nombre)
+            self._data_version = version
+            self._last_seq = last_seq
+
+    def _read_version(self) -> int | None:
+        with self._conn_lock:
+            if self._conn is None:
+                return None
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _foreign_write(self) -> bool:
+        if self._conn is None:
+            return False
+        now = time.monotonic()
+        if now - self._checked_at < self.recheck_interval:
+            return False
+        self._checked_at = now
+        return self._read_version() != self._data_version
+
+    def _on_write(self, nombres: list[str] | None):
+        with self._lock:
+            if nombres is None:
+                self._bloom = None
+                return
+            if self._pending is not None:
+                self._pending.extend(nombres)
+            if self._bloom is not None:
+                for nombre in nombres:
+                    self._bloom.add(nombre)
@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class SQLiteProfile:
+    """Conjunto de pragmas de rendimiento aplicado a cada conexión.
+
+    Atributos:
+        name: Nombre con el que se selecciona el perfil.
+        journal_mode: Modo de journal; WAL permite leer mientras se escribe.
+        synchronous: Nivel de sincronización con disco (FULL, NORMAL, OFF).
+        cache_size: Caché de páginas; los valores negativos son KiB.
+        mmap_size: Bytes de la base de datos accesibles por mmap.
+        temp_store: Dónde se guardan las tablas e índices temporales.
+        checkpoint_interval: Segundos entre checkpoints de WAL en segundo
+            plano, o None para dejar el autocheckpoint de SQLite.
+    """
+
+    name: str
+    journal_mode: str
+    synchronous: str
+    cache_size: int
+    mmap_size: int
+    temp_store: str
+    checkpoint_interval: float | None
+
+    def pragmas(self) -> list[str]:
+        """Pragmas por conexión (journal_mode se aplica aparte)."""
+        # Con checkpoints en segundo plano se desactiva el autocheckpoint
+        # para que ningún commit cargue con el costo de copiar el WAL.
+        autocheckpoint = 0 if self.checkpoint_interval else 1000
+        return [
+            f"PRAGMA synchronous = {self.synchronous}",
+            f"PRAGMA cache_size = {self.cache_size}",
+            f"PRAGMA mmap_size = {self.mmap_size}",
+            f"PRAGMA temp_store = {self.temp_store}",
+            f"PRAGMA wal_autocheckpoint = {autocheckpoint}",
+        ]
+
+
+PROFILES = {
+    profile.name: profile
+    for profile in (
+        # Cada commit llega a disco; para datos que no se pueden perder.
+        SQLiteProfile(
+            name='durable',
+            journal_mode='WAL',
+            synchronous='FULL',
+            cache_size=-8000,
+            mmap_size=0,
+            temp_store='DEFAULT',
+            checkpoint_interval=None,
+        ),
+        # En WAL, NORMAL sólo arriesga los últimos commits ante un corte
+        # de energía, nunca la integridad del archivo.
+        SQLiteProfile(
+            name='balanced',
+            journal_mode='WAL',
+            synchronous='NORMAL',
+            cache_size=-32000,
+            mmap_size=256 * 1024 * 1024,
+            temp_store='MEMORY',
+            checkpoint_interval=5.0,
+        ),
+        # Para importaciones masivas que se pueden repetir si fallan.
+        SQLiteProfile(
+            name='bulk-load',
+            journal_mode='WAL',
+            synchronous='OFF',
+            cache_size=-256000,
+            mmap_size=1024 * 1024 * 1024,
+            temp_store='MEMORY',
+            checkpoint_interval=30.0,
+        ),
+    )
+}
+
+
+def get_profile(profile: 'str | SQLiteProfile') -> SQLiteProfile:
+    """Resuelve un perfil por nombre o lo retorna tal cual."""
+    if isinstance(profile, SQLiteProfile):
+        return profile
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(
+            f"Perfil SQLite desconocido: {profile!r}. "
+            f"Disponibles: {', '.join(PROFILES)}"
+        ) from None
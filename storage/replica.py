@@ -0,0 +1,229 @@
+import itertools
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+from storage.change_feed import ultimo_seq
+from storage.connection_pool import ConnectionPool
+
+_names = itertools.count(1)
+
+
+class _ReadWriteLock:
+    """Lock con lectores simultáneos y un único escritor.
+
+    Un hilo que ya lee puede volver a entrar como lector aunque haya un
+    escritor esperando; los lectores nuevos esperan al escritor.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    @property
+    def reading(self) -> bool:
+        """Si el hilo actual tiene el lock como lector."""
+        return getattr(self._local, 'depth', 0) > 0
+
+    @contextmanager
+    def read(self):
+        depth = getattr(self._local, 'depth', 0)
+        with self._cond:
+            if not depth:
+                while self._writer or self._waiting_writers:
+                    self._cond.wait()
+            self._readers += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class MemoryReplica:
+    """Copia en memoria de la base para servir lecturas sin tocar el disco.
+
+    Se llena con Connection.backup() y luego se actualiza aplicando las
+    filas nuevas de users_changelog (ver ChangeFeed). Si el registro se
+    compactó más allá de lo aplicado, se vuelve a copiar entera.
+
+    Las lecturas pueden ver datos con hasta `max_staleness` segundos de
+    antigüedad respecto de escrituras de otros procesos; las escrituras de
+    este proceso marcan la réplica para refrescarla en la lectura siguiente.
+
+    La copia es una base en memoria con nombre y caché compartida: cada
+    hilo lee con su propia conexión, como las lectoras del pool, y varios
+    hilos leen a la vez. Los refrescos la modifican con una conexión
+    aparte mientras no hay lecturas en curso.
+    """
+
+    def __init__(self, pool: ConnectionPool, max_staleness: float = 1.0):
+        """
+        Args:
+            pool: Pool de la base en disco que se replica.
+            max_staleness: Segundos máximos sin comprobar si hay cambios.
+        """
+        self.pool = pool
+        self.max_staleness = max_staleness
+        self._lock = threading.Lock()
+        self._rw = _ReadWriteLock()
+        self._uri = f"file:replica-{next(_names)}?mode=memory&cache=shared"
+        self._source = pool.connect()
+        # Mantiene viva la base en memoria y aplica los cambios
+        self._master: sqlite3.Connection | None = None
+        self._readers: dict[int, tuple[weakref.ref, sqlite3.Connection]] = {}
+        self._data_version: int | None = None
+        self._synced_at = 0.0
+        self._dirty = True
+        self.last_seq = 0
+        self.full_syncs = 0
+        self.applied = 0
+        pool.add_write_listener(self._on_write)
+
+    @classmethod
+    def for_pool(cls, pool: ConnectionPool, **kwargs) -> 'MemoryReplica':
+        """Réplica compartida por todos los LocalDB del mismo archivo."""
+        return pool.shared(cls.__name__, lambda: cls(pool, **kwargs))
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(
+            self._uri,
+            uri=True,
+            check_same_thread=False,
+            factory=(self.pool.instrumentation.connection_factory
+                     if self.pool.instrumentation else sqlite3.Connection)
+        )
+
+    @contextmanager
+    def reader(self):
+        """Presta la conexión del hilo actual, con la réplica refrescada si hace falta."""
+        if not self._rw.reading:
+            # Dentro de una lectura del mismo hilo no se puede refrescar
+            self.refresh()
+        with self._rw.read():
+            yield self.connection()
+
+    def connection(self) -> sqlite3.Connection:
+        """Conexión a la réplica del hilo actual.
+
+        Es sólo de este hilo y ningún refresco la cierra, pero tampoco la
+        protege de un refresco concurrente: para leer conviene reader().
+        """
+        ident = threading.get_ident()
+        entry = self._readers.get(ident)
+        if entry is not None and entry[0]() is threading.current_thread():
+            return entry[1]
+        if self._master is None:
+            self.refresh()
+        with self._lock:
+            for other, (thread_ref, conn) in list(self._readers.items()):
+                thread = thread_ref()
+                if thread is None or not thread.is_alive():
+                    del self._readers[other]
+                    conn.close()
+            conn = self._connect()
+            self._readers[ident] = (weakref.ref(threading.current_thread()), conn)
+        return conn
+
+    def refresh(self, force: bool = False):
+        """Trae los cambios del disco si pasó `max_staleness` o hubo escrituras."""
+        if (not force and not self._dirty and self._master is not None
+                and time.monotonic() - self._synced_at < self.max_staleness):
+            return
+        with self._rw.write():
+            now = time.monotonic()
+            if (not force and not self._dirty and self._master is not None
+                    and now - self._synced_at < self.max_staleness):
+                return
+            self._dirty = False
+            version = self._source.execute("PRAGMA data_version").fetchone()[0]
+            if self._master is None:
+                self._full_sync()
+            elif version != self._data_version or force:
+                self._apply_changes()
+            self._data_version = version
+            self._synced_at = now
+
+    def _full_sync(self):
+        """Requiere el lock de escritura."""
+        if self._master is None:
+            self._master = self._connect()
+        # backup() reemplaza el contenido de la base compartida: las
+        # conexiones de los lectores siguen sirviendo
+        self._source.backup(self._master)
+        conn = self._master
+        # La copia incluye el registro: su último seq es el punto aplicado
+        self.last_seq = ultimo_seq(conn)
+        conn.execute("DELETE FROM users_changelog")
+        conn.commit()
+        self.full_syncs += 1
+
+    def _apply_changes(self):
+        """Requiere el lock de escritura."""
+        rows = self._source.execute(
+            "SELECT seq, op, user_id, nombre, rol FROM users_changelog "
+            "WHERE seq > ? ORDER BY seq",
+            (self.last_seq,)
+        ).fetchall()
+        if not rows:
+            # Sin filas nuevas puede que se hayan compactado todas
+            if ultimo_seq(self._source) > self.last_seq:
+                self._full_sync()
+            return
+        if rows[0][0] != self.last_seq + 1:
+            self._full_sync()
+            return
+        conn = self._master
+        with conn:
+            for seq, op, user_id, nombre, rol in rows:
+                if op == 'delete':
+                    conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+                else:
+                    conn.execute(
+                        "INSERT INTO users (id, nombre, rol) VALUES (?, ?, ?) "
+                        "ON CONFLICT (id) DO UPDATE SET "
+                        "nombre = excluded.nombre, rol = excluded.rol",
+                        (user_id, nombre, rol)
+                    )
+            # Los triggers de la réplica también anotan: no hace falta
+            conn.execute("DELETE FROM users_changelog")
+        self.last_seq = rows[-1][0]
+        self.applied += len(rows)
+
+    def _on_write(self, nombres):
+        self._dirty = True
+
+    def stop(self):
+        with self._rw.write():
+            with self._lock:
+                for _, conn in self._readers.values():
+                    conn.close()
+                self._readers.clear()
+            if self._master is not None:
+                self._master.close()
+                self._master = None
+            self._source.close()
@@ -0,0 +1,50 @@
+import random
+import sqlite3
+from dataclasses import dataclass
+
+
+class DatabaseBusyError(sqlite3.OperationalError):
+    """La base siguió bloqueada por otro proceso tras agotar los reintentos."""
+
+
+def is_busy(error: BaseException) -> bool:
+    """Si el error es un SQLITE_BUSY/SQLITE_LOCKED que vale la pena reintentar."""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    name = getattr(error, 'sqlite_errorname', None)
+    if name is not None:
+        return name.startswith(('SQLITE_BUSY', 'SQLITE_LOCKED'))
+    message = str(error)
+    return 'database is locked' in message or 'database is busy' in message
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Reintentos con backoff exponencial y jitter para escrituras bloqueadas.
+
+    busy_timeout ya hace esperar a SQLite dentro de cada intento; la
+    política cubre los casos en que aun así vence, y el jitter evita que
+    varios procesos vuelvan a chocar al mismo tiempo.
+
+    Atributos:
+        attempts: Intentos en total, incluido el primero.
+        base_delay: Espera máxima antes del primer reintento, en segundos.
+        max_delay: Tope de la espera entre intentos, en segundos.
+    """
+
+    attempts: int = 5
+    base_delay: float = 0.01
+    max_delay: float = 1.0
+
+    def __post_init__(self):
+        if self.attempts < 1:
+            raise ValueError("attempts debe ser mayor que cero")
+
+    def delay(self, attempt: int) -> float:
+        """Espera antes del reintento número `attempt` (desde 1).
+
+        "Full jitter": un valor uniforme entre 0 y el backoff exponencial.
+        """
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
@@ -1,31 +1,453 @@
+import sqlite3
+from concurrent.futures import Future
+from itertools import islice
+from typing import Iterable, Iterator, Mapping
+
 from models.user import User
+from models.user_batch import UserBatch
+from storage.change_feed import compactar_registro
 from storage.local_db import LocalDB
+from storage.write_queue import GroupCommitQueue
+from ui.config.settings import AppSettings
+
+COLUMNS = ('id', 'nombre', 'rol')
+
+# Mayor punto de código: prefijo + PREFIX_END acota por arriba el rango de
+# todos los nombres que empiezan por ese prefijo.
+PREFIX_END = chr(0x10FFFF)
+
+# Sentencia de inserción para cada política de conflicto sobre el índice
+# único de nombre. 'replace' conserva el ID y sólo actualiza el rol.
+CONFLICT_POLICIES = {
+    'fail': "INSERT INTO users (nombre, rol) VALUES (?, ?)",
+    'skip': "INSERT OR IGNORE INTO users (nombre, rol) VALUES (?, ?)",
+    'replace': (
+        "INSERT INTO users (nombre, rol) VALUES (?, ?) "
+        "ON CONFLICT (nombre) DO UPDATE SET rol = excluded.rol"
+    ),
+}
+
+# Búsquedas múltiples: claves por sentencia IN (...) como mucho, y a partir
+# de cuántas claves conviene cargarlas en una tabla temporal y hacer join.
+MAX_KEYS_PER_STATEMENT = 500
+TEMP_TABLE_THRESHOLD = 5000
+
+# Columnas de la clave de recorrido para cada orden admitido. Todas son
+# únicas y están cubiertas por un índice, así que cada página es un seek,
+# también en orden descendente (el índice se recorre al revés).
+ORDER_KEYS = {
+    'id': ('id',),
+    'nombre': ('nombre',),
+    'rol': ('rol', 'nombre'),
+}
 
 
 class UserStorage:
-    def __init__(self):
-        self.db = LocalDB()
+    def __init__(
+            self,
+            db: LocalDB | None = None,
+            database: str | None = None,
+            group_commit: bool | None = None,
+            **db_options
+    ):
+        """
+        Args:
+            db: Base de datos ya abierta. Si se omite se crea un LocalDB
+                con `database` y `db_options` (ver LocalDB).
+            group_commit: Si crear_usuario pasa por la cola de escritura
+                agrupada (ver GroupCommitQueue). Por defecto
+                AppSettings.GROUP_COMMIT.
+        """
+        self.db = db or LocalDB(database, **db_options)
+        if group_commit is None:
+            group_commit = AppSettings.GROUP_COMMIT
+        self.write_queue = GroupCommitQueue.for_db(
+            self.db,
+            max_batch=AppSettings.GROUP_COMMIT_MAX_BATCH,
+            max_delay=AppSettings.GROUP_COMMIT_WINDOW / 1000
+        ) if group_commit else None
 
     def get_by_nombre(self, nombre: str) -> User | None:
-        cursor = self.db.conn.execute(
-            "SELECT id, nombre, rol FROM users WHERE nombre = ?",
-            (nombre,)
+        with self.db.reader() as conn:
+            cursor = conn.execute(
+                "SELECT id, nombre, rol FROM users WHERE nombre = ?",
+                (nombre,)
+            )
+            cursor.row_factory = User.from_row
+            return cursor.fetchone()
+
+    def get_many_by_id(self, ids: Iterable[int]) -> dict[int, User]:
+        """Usuarios de los IDs pedidos, indexados por ID.
+
+        Los IDs que no existen no aparecen en el resultado.
+        """
+        return self._get_many('id', ids)
+
+    def get_many_by_nombre(self, nombres: Iterable[str]) -> dict[str, User]:
+        """Usuarios de los nombres pedidos, indexados por nombre.
+
+        Los nombres que no existen no aparecen en el resultado.
+        """
+        return self._get_many('nombre', nombres)
+
+    def _get_many(self, column: str, keys: Iterable) -> dict:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        with self.db.reader() as conn:
+            if len(keys) >= TEMP_TABLE_THRESHOLD:
+                users = self._get_many_temp_table(conn, column, keys)
+            else:
+                users = self._get_many_chunked(conn, column, keys)
+        position = COLUMNS.index(column)
+        return {user[position]: User(*user) for user in users}
+
+    @staticmethod
+    def _get_many_chunked(conn, column: str, keys: list) -> list[tuple]:
+        # SQLite limita los parámetros por sentencia (999 en versiones viejas)
+        limit = MAX_KEYS_PER_STATEMENT
+        if hasattr(conn, 'getlimit'):
+            limit = min(limit, conn.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER))
+        rows = []
+        for start in range(0, len(keys), limit):
+            chunk = keys[start:start + limit]
+            rows += conn.execute(
+                f"SELECT id, nombre, rol FROM users "
+                f"WHERE {column} IN ({', '.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+        return rows
+
+    @staticmethod
+    def _get_many_temp_table(conn, column: str, keys: list) -> list[tuple]:
+        # Una tabla temporal y un join evitan miles de sentencias IN
+        conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS lookup_keys (k PRIMARY KEY) WITHOUT ROWID"
         )
-        row = cursor.fetchone()
-        if row:
-            return User(id=row[0], nombre=row[1], rol=row[2])
-        return None
+        try:
+            conn.executemany(
+                "INSERT INTO lookup_keys (k) VALUES (?)", ((k,) for k in keys)
+            )
+            return conn.execute(
+                f"SELECT u.id, u.nombre, u.rol FROM lookup_keys k "
+                f"JOIN users u ON u.{column} = k.k"
+            ).fetchall()
+        finally:
+            conn.execute("DELETE FROM lookup_keys")
+            conn.commit()
 
     def crear_usuario(self, nombre: str, rol: int) -> User:
-        cursor = self.db.conn.execute(
+        if self.write_queue is not None:
+            return self.write_queue.submit(nombre, rol).result()
+        cursor = self.db.transaction(lambda conn: conn.execute(
             "INSERT INTO users (nombre, rol) VALUES (?, ?)",
             (nombre, rol)
-        )
-        self.db.conn.commit()
+        ))
+        self.db.notify_write([nombre])
         return User(id=cursor.lastrowid, nombre=nombre, rol=rol)
 
+    def crear_usuario_async(self, nombre: str, rol: int) -> 'Future[User]':
+        """Como crear_usuario, pero retorna un Future sin esperar el commit.
+
+        Sin group_commit, la inserción ya está confirmada al retornar.
+        """
+        if self.write_queue is not None:
+            return self.write_queue.submit(nombre, rol)
+        future: Future = Future()
+        try:
+            future.set_result(self.crear_usuario(nombre, rol))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def crear_usuarios_bulk(
+            self,
+            usuarios: Iterable[tuple | Mapping | User],
+            chunk_size: int = 1000,
+            on_conflict: str = 'fail'
+    ) -> int:
+        """Inserta usuarios en lotes, un executemany y un commit por lote.
+
+        Args:
+            usuarios: Tuplas (nombre, rol), diccionarios con esas claves o
+                instancias de User. Se consumen de forma perezosa.
+            chunk_size: Filas por transacción. Si otro proceso bloquea la
+                base, se reintenta el lote en curso.
+            on_conflict: Qué hacer si el nombre ya existe: 'fail' lanza
+                sqlite3.IntegrityError y revierte el lote en curso (los
+                anteriores quedan guardados), 'skip' lo ignora y 'replace'
+                actualiza su rol.
+
+        Al terminar compacta el registro de cambios a
+        AppSettings.CHANGELOG_RETENTION, ya que una importación puede
+        correr en un proceso sin ChangeFeed.
+
+        Returns:
+            int: Filas insertadas o actualizadas.
+        """
+        try:
+            sql = CONFLICT_POLICIES[on_conflict]
+        except KeyError:
+            raise ValueError(
+                f"Política de conflicto no soportada: {on_conflict!r}. "
+                f"Disponibles: {', '.join(CONFLICT_POLICIES)}"
+            ) from None
+        if chunk_size < 1:
+            raise ValueError("chunk_size debe ser mayor que cero")
+
+        params = map(self._as_params, usuarios)
+        total = 0
+        while chunk := list(islice(params, chunk_size)):
+            total += self.db.transaction(
+                lambda conn: conn.executemany(sql, chunk).rowcount
+            )
+            self.db.notify_write([nombre for nombre, _ in chunk])
+        if total:
+            self.db.transaction(lambda conn: compactar_registro(
+                conn, AppSettings.CHANGELOG_RETENTION
+            ))
+        return total
+
+    @staticmethod
+    def _as_params(usuario: tuple | Mapping | User) -> tuple[str, int]:
+        if isinstance(usuario, User):
+            return usuario.nombre, usuario.rol
+        if isinstance(usuario, Mapping):
+            nombre, rol = usuario['nombre'], usuario.get('rol')
+        else:
+            nombre, rol = usuario
+        # Un rol vacío (p. ej. "ana," en un CSV) es el rol por defecto
+        return nombre, 2 if rol is None or rol == '' else int(rol)
+
     def get_all(self) -> list[User]:
         """Obtiene todos los usuarios"""
-        cursor = self.db.conn.execute("SELECT id, nombre, rol FROM users")
-        return [User(id=row[0], nombre=row[1], rol=row[2])
-                for row in cursor.fetchall()]
\ No newline at end of file
+        with self.db.reader() as conn:
+            cursor = conn.execute("SELECT id, nombre, rol FROM users")
+            cursor.row_factory = User.from_row
+            return cursor.fetchall()
+
+    def get_all_batch(
+            self,
+            batch_size: int = 10000,
+            order_by: str = 'id',
+            descending: bool = False
+    ) -> UserBatch:
+        """Obtiene todos los usuarios en un UserBatch columnar.
+
+        Para tablas grandes ocupa una fracción de la memoria de get_all()
+        y no crea un objeto User por fila.
+        """
+        return UserBatch.from_row_batches(
+            self.iter_rows(batch_size, order_by, descending)
+        )
+
+    def count(self) -> int:
+        """Cantidad total de usuarios, leída de la tabla de resumen."""
+        with self.db.reader() as conn:
+            return conn.execute(
+                "SELECT COALESCE(SUM(total), 0) FROM users_stats"
+            ).fetchone()[0]
+
+    def count_by_rol(self) -> dict[int, int]:
+        """Cantidad de usuarios por rol, leída de la tabla de resumen."""
+        with self.db.reader() as conn:
+            return dict(conn.execute(
+                "SELECT rol, total FROM users_stats WHERE total > 0 ORDER BY rol"
+            ).fetchall())
+
+    def exists(self, nombre: str) -> bool:
+        with self.db.reader() as conn:
+            return conn.execute(
+                "SELECT 1 FROM users WHERE nombre = ?", (nombre,)
+            ).fetchone() is not None
+
+    def buscar(
+            self,
+            prefijo: str,
+            limit: int | None = None,
+            order_by: str = 'nombre',
+            descending: bool = False
+    ) -> list[User]:
+        """Usuarios cuyo nombre empieza por `prefijo`.
+
+        La coincidencia no distingue mayúsculas de minúsculas (sólo en
+        ASCII, como la colación NOCASE de SQLite) y se resuelve como un
+        rango sobre el índice idx_users_nombre_nocase. El orden, en cambio,
+        es el mismo que el de la lista completa (ORDER_KEYS, con la
+        colación BINARY), para que ordenar por nombre no cambie según haya
+        o no una búsqueda; SQLite ordena las coincidencias antes de cortar.
+        """
+        if limit is None:
+            limit = AppSettings.TABLE_ROWS_PER_PAGE
+        order = self._order_clause(self._order_keys(order_by), descending)
+        with self.db.reader() as conn:
+            cursor = conn.execute(
+                "SELECT id, nombre, rol FROM users "
+                "WHERE nombre >= ? COLLATE NOCASE AND nombre < ? COLLATE NOCASE "
+                f"ORDER BY {order} LIMIT ?",
+                (prefijo, prefijo + PREFIX_END, limit)
+            )
+            cursor.row_factory = User.from_row
+            return cursor.fetchall()
+
+    def iter_page(
+            self,
+            after_id: int | None = None,
+            limit: int | None = None,
+            order_by: str = 'id',
+            descending: bool = False,
+            after: User | None = None
+    ) -> list[User]:
+        """Obtiene una página de usuarios usando paginación por clave.
+
+        Args:
+            after_id: ID del último usuario de la página anterior, o None
+                para la primera página.
+            limit: Tamaño de página; por defecto
+                AppSettings.TABLE_ROWS_PER_PAGE.
+            order_by: 'id', 'nombre' o 'rol'.
+            descending: Recorre el orden de mayor a menor.
+            after: El último usuario de la página anterior, en lugar de
+                after_id. Su clave de orden no se vuelve a leer, así que
+                sirve aunque se haya borrado.
+
+        Returns:
+            list[User]: Como mucho `limit` usuarios posteriores a `after_id`
+            en el orden pedido.
+
+        Raises:
+            LookupError: Si se ordena por otra columna que el ID y el
+                usuario `after_id` ya no existe.
+        """
+        keys = self._order_keys(order_by)
+        if limit is None:
+            limit = AppSettings.TABLE_ROWS_PER_PAGE
+        key = None
+        if after is not None:
+            key = self._key_of((after.id, after.nombre, after.rol), keys)
+        elif after_id is not None:
+            key = self._key_of_id(keys, after_id)
+            if key is None:
+                raise LookupError(
+                    f"El usuario {after_id} ya no existe; pasa after con el "
+                    f"último usuario de la página para seguir por {order_by!r}"
+                )
+        return [User(*row) for row in self._seek(keys, key, limit, descending)]
+
+    def get_window(
+            self,
+            offset: int,
+            limit: int,
+            order_by: str = 'id',
+            descending: bool = False,
+            after_id: int | None = None
+    ) -> list[tuple]:
+        """Filas (id, nombre, rol) desde la posición `offset` del orden pedido.
+
+        Pensado para tablas virtuales que saltan a cualquier posición del
+        scroll. Con OFFSET, SQLite recorre y descarta todas las filas
+        anteriores, así que el costo crece con la posición. Si se conoce la
+        fila anterior a `offset` (por ejemplo, la última del bloque ya
+        cargado justo antes) se sigue por clave desde ella, con el costo de
+        una búsqueda en el índice; OFFSET queda para los saltos a una zona
+        sin filas cargadas o si esa fila ya no existe.
+
+        Args:
+            after_id: ID de la fila en la posición offset - 1, si se conoce.
+        """
+        keys = self._order_keys(order_by)
+        if after_id is not None:
+            after = self._key_of_id(keys, after_id)
+            if after is not None:
+                return self._seek(keys, after, limit, descending)
+        with self.db.reader() as conn:
+            return conn.execute(
+                f"SELECT id, nombre, rol FROM users "
+                f"ORDER BY {self._order_clause(keys, descending)} LIMIT ? OFFSET ?",
+                (limit, offset)
+            ).fetchall()
+
+    def iter_all(
+            self,
+            batch_size: int | None = None,
+            order_by: str = 'id',
+            descending: bool = False
+    ) -> Iterator[User]:
+        """Recorre todos los usuarios por lotes con memoria constante.
+
+        Cada lote es una consulta independiente que continúa desde la clave
+        del último usuario recibido, así que no se mantiene ninguna lectura
+        abierta entre lotes.
+        """
+        for rows in self.iter_rows(batch_size, order_by, descending):
+            for row in rows:
+                yield User(*row)
+
+    def iter_rows(
+            self,
+            batch_size: int | None = None,
+            order_by: str = 'id',
+            descending: bool = False
+    ) -> Iterator[list[tuple]]:
+        """Como iter_all, pero entrega lotes de tuplas (id, nombre, rol)."""
+        keys = self._order_keys(order_by)
+        if batch_size is None:
+            batch_size = AppSettings.TABLE_ROWS_PER_PAGE
+        after = None
+        while True:
+            rows = self._seek(keys, after, batch_size, descending)
+            if rows:
+                yield rows
+            if len(rows) < batch_size:
+                return
+            after = self._key_of(rows[-1], keys)
+
+    def _seek(
+            self,
+            keys: tuple[str, ...],
+            after: tuple | None,
+            limit: int,
+            descending: bool = False
+    ) -> list[tuple]:
+        """Filas (id, nombre, rol) posteriores a la clave `after` en el orden pedido."""
+        columns = ', '.join(keys)
+        sql = "SELECT id, nombre, rol FROM users"
+        params: tuple = ()
+        if after is not None:
+            placeholders = ', '.join('?' * len(keys))
+            sql += f" WHERE ({columns}) {'<' if descending else '>'} ({placeholders})"
+            params = tuple(after)
+        sql += f" ORDER BY {self._order_clause(keys, descending)} LIMIT ?"
+        with self.db.reader() as conn:
+            return conn.execute(sql, params + (limit,)).fetchall()
+
+    def _key_of_id(self, keys: tuple[str, ...], user_id: int) -> tuple | None:
+        if keys == ('id',):
+            return (user_id,)
+        # La posición se resuelve con el propio ID, así el llamador no
+        # necesita conocer las columnas de la clave de orden.
+        with self.db.reader() as conn:
+            return conn.execute(
+                f"SELECT {', '.join(keys)} FROM users WHERE id = ?",
+                (user_id,)
+            ).fetchone()
+
+    @staticmethod
+    def _order_clause(keys: tuple[str, ...], descending: bool) -> str:
+        if descending:
+            return ', '.join(f"{key} DESC" for key in keys)
+        return ', '.join(keys)
+
+    @staticmethod
+    def _key_of(row: tuple, keys: tuple[str, ...]) -> tuple:
+        return tuple(row[COLUMNS.index(key)] for key in keys)
+
+    @staticmethod
+    def _order_keys(order_by: str) -> tuple[str, ...]:
+        try:
+            return ORDER_KEYS[order_by]
+        except KeyError:
+            raise ValueError(
+                f"Orden no soportado: {order_by!r}. "
+                f"Disponibles: {', '.join(ORDER_KEYS)}"
+            ) from None
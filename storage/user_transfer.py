@@ -0,0 +1,206 @@
+"""Importación y exportación de usuarios desde la línea de comandos.
+
+No levanta Tk, así que sirve para tareas programadas.
+
+Uso:
+    python -m storage.user_transfer importar usuarios.csv
+    python -m storage.user_transfer importar usuarios.jsonl --on-conflict skip
+    python -m storage.user_transfer exportar usuarios.csv.gz
+"""
+import argparse
+import csv
+import gzip
+import json
+import sqlite3
+import sys
+from typing import Callable, Iterator
+
+from storage.local_db import LocalDB
+from storage.profiles import PROFILES
+from storage.user_storage import CONFLICT_POLICIES, UserStorage
+
+
+def detectar_formato(ruta: str) -> str:
+    if ruta.endswith('.gz'):
+        ruta = ruta[:-3]
+    return 'jsonl' if ruta.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def _abrir(ruta: str, modo: str, comprimir: bool | None = None):
+    if comprimir is None:
+        comprimir = ruta.endswith('.gz')
+    if comprimir:
+        return gzip.open(ruta, modo + 't', newline='', encoding='utf-8')
+    return open(ruta, modo, newline='', encoding='utf-8')
+
+
+class RegistroInvalido(ValueError):
+    """Un registro del archivo de importación no se puede interpretar."""
+
+    def __init__(self, linea: int, motivo: str):
+        super().__init__(f"línea {linea}: {motivo}")
+        self.linea = linea
+
+
+def leer_usuarios(archivo, formato: str) -> Iterator[dict]:
+    """Lee registros {nombre, rol} de un CSV con cabecera o de un JSONL.
+
+    Un rol vacío o ausente es 2 (usuario).
+
+    Raises:
+        RegistroInvalido: Con el número de línea del primer registro sin
+            nombre, con un rol que no es un número o con JSON inválido.
+    """
+    if formato == 'csv':
+        lector = csv.DictReader(archivo)
+        for registro in lector:
+            yield _validar(registro, lector.line_num)
+    else:
+        for numero, linea in enumerate(archivo, 1):
+            if not linea.strip():
+                continue
+            try:
+                registro = json.loads(linea)
+            except json.JSONDecodeError as e:
+                raise RegistroInvalido(numero, f"JSON inválido ({e.msg})") from None
+            if not isinstance(registro, dict):
+                raise RegistroInvalido(numero, "se esperaba un objeto JSON")
+            yield _validar(registro, numero)
+
+
+def _validar(registro: dict, linea: int) -> dict:
+    nombre = registro.get('nombre')
+    if not nombre:
+        raise RegistroInvalido(linea, "falta el nombre")
+    rol = registro.get('rol')
+    if rol is None or rol == '':
+        rol = 2
+    try:
+        rol = int(rol)
+    except (TypeError, ValueError):
+        raise RegistroInvalido(linea, f"rol inválido {rol!r}") from None
+    return {'nombre': nombre, 'rol': rol}
+
+
+def importar(
+        ruta: str,
+        storage: UserStorage,
+        formato: str | None = None,
+        chunk_size: int = 1000,
+        on_conflict: str = 'fail'
+) -> int:
+    formato = formato or detectar_formato(ruta)
+    with _abrir(ruta, 'r') as archivo:
+        return storage.crear_usuarios_bulk(
+            leer_usuarios(archivo, formato),
+            chunk_size=chunk_size,
+            on_conflict=on_conflict
+        )
+
+
+def exportar(
+        ruta: str,
+        storage: UserStorage,
+        formato: str | None = None,
+        comprimir: bool | None = None,
+        batch_size: int = 5000,
+        progress: Callable[[int], None] | None = None
+) -> int:
+    """Escribe todos los usuarios en CSV o JSONL con memoria constante.
+
+    Los usuarios se leen por lotes con paginación por clave, así que la
+    memoria no depende del tamaño de la tabla y ninguna lectura queda
+    abierta mientras se escribe el archivo.
+
+    Args:
+        ruta: Archivo de destino; si termina en .gz se comprime.
+        storage: Origen de los usuarios.
+        formato: 'csv' o 'jsonl'; por defecto se deduce de la ruta.
+        comprimir: Fuerza o desactiva la compresión gzip.
+        batch_size: Filas leídas por consulta.
+        progress: Se llama con el total escrito tras cada lote.
+
+    Returns:
+        int: Cantidad de usuarios exportados.
+    """
+    formato = formato or detectar_formato(ruta)
+    total = 0
+    with _abrir(ruta, 'w', comprimir) as archivo:
+        if formato == 'csv':
+            writer = csv.writer(archivo)
+            writer.writerow(('id', 'nombre', 'rol'))
+            escribir = writer.writerows
+        else:
+            def escribir(rows):
+                archivo.writelines(
+                    json.dumps(
+                        {'id': id, 'nombre': nombre, 'rol': rol},
+                        ensure_ascii=False
+                    ) + '\n'
+                    for id, nombre, rol in rows
+                )
+        for rows in storage.iter_rows(batch_size):
+            escribir(rows)
+            total += len(rows)
+            if progress:
+                progress(total)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m storage.user_transfer',
+        description='Transferencia masiva de usuarios de la base local.'
+    )
+    parser.add_argument('--database', help='Ruta o URI (con --uri) de la base')
+    parser.add_argument('--uri', action='store_true')
+    parser.add_argument('--profile', choices=list(PROFILES), default='bulk-load')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    p_importar = comandos.add_parser('importar', help='Importa un CSV o JSONL')
+    p_importar.add_argument('archivo')
+    p_importar.add_argument('--formato', choices=['csv', 'jsonl'])
+    p_importar.add_argument('--chunk-size', type=int, default=5000)
+    p_importar.add_argument(
+        '--on-conflict', choices=list(CONFLICT_POLICIES), default='fail'
+    )
+
+    p_exportar = comandos.add_parser('exportar', help='Exporta a CSV o JSONL')
+    p_exportar.add_argument('archivo')
+    p_exportar.add_argument('--formato', choices=['csv', 'jsonl'])
+    p_exportar.add_argument('--gzip', action='store_true', default=None)
+    p_exportar.add_argument('--batch-size', type=int, default=5000)
+
+    args = parser.parse_args(argv)
+    storage = UserStorage(
+        LocalDB(args.database, profile=args.profile, uri=args.uri)
+    )
+
+    if args.comando == 'importar':
+        try:
+            total = importar(
+                args.archivo,
+                storage,
+                formato=args.formato,
+                chunk_size=args.chunk_size,
+                on_conflict=args.on_conflict
+            )
+        except (RegistroInvalido, sqlite3.IntegrityError) as e:
+            # Los lotes anteriores al error ya quedaron guardados
+            print(f"Error en {args.archivo}, {e}", file=sys.stderr)
+            return 1
+        print(f"{total} usuarios importados")
+    elif args.comando == 'exportar':
+        total = exportar(
+            args.archivo,
+            storage,
+            formato=args.formato,
+            comprimir=args.gzip,
+            batch_size=args.batch_size
+        )
+        print(f"{total} usuarios exportados")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from models.user import User
+from storage.local_db import LocalDB
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class GroupCommitQueue:
+    """Cola de escritura que agrupa registros en una sola transacción.
+
+    Las inserciones que llegan dentro de `max_delay` segundos (o hasta
+    `max_batch` filas) se confirman juntas con un único commit, así que el
+    rendimiento sostenido depende del tamaño del lote y no de cuántos
+    fsync por segundo admite el disco.
+
+    Cada inserción corre en su propio SAVEPOINT: si una falla (por ejemplo,
+    un nombre repetido) sólo su Future recibe la excepción y el resto del
+    lote se confirma igual. Los Future se resuelven después del commit.
+    """
+
+    def __init__(
+            self,
+            db: LocalDB,
+            max_batch: int = 256,
+            max_delay: float = 0.005
+    ):
+        """
+        Args:
+            db: Base de datos donde se escribe.
+            max_batch: Filas máximas por transacción.
+            max_delay: Segundos que se espera a más filas tras la primera.
+        """
+        self.db = db
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._closed = False
+        self.batches = 0
+        self.rows = 0
+        self._thread = threading.Thread(
+            target=self._run, name='users-group-commit', daemon=True
+        )
+        self._thread.start()
+
+    @classmethod
+    def for_db(cls, db: LocalDB, **kwargs) -> 'GroupCommitQueue':
+        """Cola compartida por todos los LocalDB del mismo archivo."""
+        return db.pool.shared(cls.__name__, lambda: cls(db, **kwargs))
+
+    def submit(self, nombre: str, rol: int) -> 'Future[User]':
+        """Encola la inserción de un usuario; el Future recibe el User."""
+        if self._closed or not self._thread.is_alive():
+            raise RuntimeError("La cola de escritura está cerrada")
+        future: Future = Future()
+        self._queue.put((nombre, rol, future))
+        return future
+
+    def _collect(self) -> list | None:
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=max(timeout, 0))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Se confirma lo ya recibido y se vuelve a encolar el aviso
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while (batch := self._collect()) is not None:
+            batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+            if batch:
+                try:
+                    self._commit(batch)
+                except Exception:
+                    # _commit ya resolvió los Future; el hilo debe seguir
+                    # atendiendo la cola o los siguientes esperarían siempre
+                    logger.exception("Error inesperado al confirmar un lote")
+
+    @staticmethod
+    def _insert(conn, batch: list) -> list:
+        results = []
+        for nombre, rol, future in batch:
+            conn.execute("SAVEPOINT fila")
+            try:
+                cursor = conn.execute(
+                    "INSERT INTO users (nombre, rol) VALUES (?, ?)",
+                    (nombre, rol)
+                )
+            except sqlite3.Error as e:
+                conn.execute("ROLLBACK TO fila")
+                results.append((future, None, e))
+            else:
+                user = User(id=cursor.lastrowid, nombre=nombre, rol=rol)
+                results.append((future, user, None))
+            conn.execute("RELEASE fila")
+        return results
+
+    def _commit(self, batch: list):
+        try:
+            # Si otro proceso bloquea la base se reintenta el lote completo
+            results = self.db.transaction(lambda conn: self._insert(conn, batch))
+        except BaseException as e:
+            # Falló el commit: ninguna fila del lote quedó guardada
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.rows += sum(1 for _, user, _ in results if user is not None)
+        try:
+            # Antes de resolver: quien reciba su User ya debe poder loguearse
+            self.db.notify_write(
+                [user.nombre for _, user, _ in results if user is not None]
+            )
+        finally:
+            for future, user, error in results:
+                if error is None:
+                    future.set_result(user)
+                else:
+                    future.set_exception(error)
+
+    def stop(self):
+        """Confirma lo pendiente y detiene el hilo de escritura."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        if self._thread is not threading.current_thread():
+            self._thread.join()
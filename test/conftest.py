@@ -0,0 +1,11 @@
+import pytest
+
+from storage.connection_pool import connection_manager
+
+
+@pytest.fixture(autouse=True)
+def base_de_datos_temporal(tmp_path, monkeypatch):
+    """Cada prueba trabaja con su propio app.db en un directorio temporal."""
+    monkeypatch.chdir(tmp_path)
+    yield
+    connection_manager.close_all()
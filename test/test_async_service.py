@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+from services.async_auth_service import AsyncAuthService
+from storage.async_user_storage import AsyncUserStorage
+
+
+def test_login_concurrente():
+    async def escenario():
+        async with AsyncAuthService(max_workers=4) as servicio:
+            await servicio.registrar("admin", 1)
+            await asyncio.gather(*(servicio.registrar(f"u{i}") for i in range(20)))
+            usuarios = await asyncio.gather(
+                *(servicio.login(f"u{i}") for i in range(20)),
+                servicio.login("nadie")
+            )
+            pagina = await servicio.iter_page(limit=5, order_by='nombre')
+            return usuarios, pagina
+
+    usuarios, pagina = asyncio.run(escenario())
+
+    assert [u.nombre for u in usuarios[:-1]] == [f"u{i}" for i in range(20)]
+    assert usuarios[-1] is None
+    assert [u.nombre for u in pagina] == ["admin", "u0", "u1", "u10", "u11"]
+
+
+def test_iter_all_asincrono():
+    async def escenario():
+        async with AsyncUserStorage() as storage:
+            await storage.crear_usuarios_bulk([(f"u{i}", 2) for i in range(7)])
+            return [u.nombre async for u in storage.iter_all(batch_size=3)]
+
+    assert len(asyncio.run(escenario())) == 7
+
+
+def test_cancelar_llamada_pendiente():
+    liberar = threading.Event()
+    ejecutadas = []
+
+    async def escenario():
+        async with AsyncUserStorage(max_workers=1, max_pending=2) as storage:
+            bloqueo = asyncio.ensure_future(storage.run(liberar.wait))
+            pendiente = asyncio.ensure_future(storage.run(ejecutadas.append, 1))
+            await asyncio.sleep(0.05)
+            pendiente.cancel()
+            await asyncio.sleep(0)
+            liberar.set()
+            await bloqueo
+            await storage.run(lambda: None)
+            return pendiente.cancelled()
+
+    assert asyncio.run(escenario())
+    assert ejecutadas == []
@@ -1,3 +1,6 @@
+import sqlite3
+import time
+
 from services.auth_service import AuthService
 
 
@@ -16,5 +19,87 @@ def test_auth():
     print(f"Nuevo usuario registrado: {nuevo.nombre}, rol: {nuevo.rol}")
 
 
+def test_login_usa_cache_e_invalida_al_escribir():
+    auth_service = AuthService(cache_size=2, cache_ttl=60)
+    auth_service.registrar("ana", 2)
+
+    assert auth_service.login("ana").rol == 2
+    assert auth_service.login("ana").rol == 2
+    stats = auth_service.cache.stats()
+    assert (stats.hits, stats.misses) == (1, 1)
+
+    # Una escritura por otro camino también invalida la entrada
+    auth_service.user_storage.crear_usuarios_bulk([("ana", 1)], on_conflict='replace')
+    assert auth_service.login("ana").rol == 1
+
+    auth_service.registrar("bea")
+    auth_service.registrar("cid")
+    auth_service.login("bea")
+    auth_service.login("cid")
+    assert auth_service.cache.stats().evictions == 1
+
+
+def test_cache_expira_por_ttl():
+    auth_service = AuthService(cache_ttl=0)
+    auth_service.registrar("ana")
+
+    auth_service.login("ana")
+    auth_service.login("ana")
+
+    stats = auth_service.cache.stats()
+    assert (stats.hits, stats.misses, stats.expirations) == (0, 2, 1)
+
+
+def test_login_rechaza_nombres_desconocidos_sin_consultar():
+    auth_service = AuthService()
+    auth_service.registrar("ana")
+    auth_service.login("ana")
+    auth_service.name_filter.wait()
+
+    sentencias = []
+    auth_service.user_storage.db.conn.set_trace_callback(sentencias.append)
+    assert auth_service.login("nadie") is None
+
+    assert not [s for s in sentencias if "FROM users" in s]
+    assert auth_service.name_filter.rejections == 1
+
+
+def test_cache_descarta_cargas_invalidadas_durante_la_lectura():
+    auth_service = AuthService()
+    auth_service.registrar("ana", 2)
+    cargar = auth_service.user_storage.get_by_nombre
+
+    def cargar_y_escribir(nombre):
+        # La fila se lee antes de que otra escritura cambie el rol
+        usuario = cargar(nombre)
+        auth_service.user_storage.crear_usuarios_bulk([("ana", 1)], on_conflict='replace')
+        return usuario
+
+    assert auth_service.cache.get_or_load("ana", cargar_y_escribir).rol == 2
+    assert auth_service.login("ana").rol == 1
+
+
+def test_cache_se_invalida_con_escrituras_de_otro_proceso():
+    auth_service = AuthService()
+    auth_service.registrar("ana", 2)
+    auth_service.registrar("bea", 2)
+    assert auth_service.login("ana").rol == 2
+    assert auth_service.login("bea") is not None
+
+    otro = sqlite3.connect("app.db")
+    otro.execute("UPDATE users SET rol = 1 WHERE nombre = 'ana'")
+    otro.execute("DELETE FROM users WHERE nombre = 'bea'")
+    otro.commit()
+    otro.close()
+
+    # El hilo vigía también puede entregar los cambios: se espera a verlos
+    deadline = time.monotonic() + 5
+    while auth_service.login("ana").rol != 1 and time.monotonic() < deadline:
+        auth_service.poll_changes()
+        time.sleep(0.01)
+    assert auth_service.login("ana").rol == 1
+    assert auth_service.login("bea") is None
+
+
 if __name__ == "__main__":
-    test_auth()
\ No newline at end of file
+    test_auth()
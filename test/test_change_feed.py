@@ -0,0 +1,103 @@
+import sqlite3
+import time
+
+from storage.change_feed import ChangeFeed
+from storage.local_db import LocalDB
+from storage.user_storage import UserStorage
+from ui.config.settings import AppSettings
+
+
+def test_feed_emite_deltas_en_orden():
+    storage = UserStorage()
+    storage.crear_usuario("previo", 2)
+    feed = ChangeFeed(storage.db)
+    recibidos = []
+    feed.subscribe(recibidos.append)
+
+    assert feed.poll() == []
+    storage.crear_usuario("ana", 2)
+    storage.crear_usuarios_bulk([("ana", 1)], on_conflict='replace')
+    with storage.db.writer() as conn:
+        conn.execute("DELETE FROM users WHERE nombre = 'previo'")
+
+    cambios = feed.poll()
+    assert [(c.op, c.nombre, c.rol) for c in cambios] == [
+        ("insert", "ana", 2), ("update", "ana", 1), ("delete", "previo", 2)
+    ]
+    assert [c.seq for c in cambios] == [2, 3, 4]
+    assert recibidos == [cambios]
+    assert feed.poll() == []
+    feed.stop()
+
+
+def test_feed_ve_escrituras_de_otro_proceso():
+    feed = ChangeFeed(LocalDB())
+    feed.poll()
+
+    otro = sqlite3.connect("app.db")
+    otro.execute("INSERT INTO users (nombre, rol) VALUES ('externo', 1)")
+    otro.commit()
+    otro.close()
+
+    assert [c.nombre for c in feed.poll()] == ["externo"]
+    feed.stop()
+
+
+def test_feed_avisa_si_se_perdieron_cambios():
+    storage = UserStorage()
+    feed = ChangeFeed(storage.db)
+    feed.poll()
+    storage.crear_usuarios_bulk([("ana", 2), ("bea", 2), ("cid", 2)], chunk_size=1)
+
+    assert feed.compactar(retain=1) == 2
+    assert feed.poll() is None
+    assert feed.last_seq == 3
+    feed.stop()
+
+
+def test_feed_pide_recargar_si_hay_demasiados_cambios():
+    storage = UserStorage()
+    feed = ChangeFeed(storage.db, max_batch=2)
+    feed.poll()
+    storage.crear_usuarios_bulk([("ana", 2), ("bea", 2), ("cid", 2)])
+
+    assert feed.poll() is None
+    assert feed.last_seq == 3
+    storage.crear_usuario("dan", 2)
+    assert [c.nombre for c in feed.poll()] == ["dan"]
+    feed.stop()
+
+
+def test_feed_en_memoria():
+    storage = UserStorage(database=":memory:")
+    feed = ChangeFeed(storage.db)
+    storage.crear_usuario("ana", 2)
+
+    assert [c.nombre for c in feed.poll()] == ["ana"]
+    assert feed.poll() == []
+    feed.stop()
+
+
+def test_feed_compacta_aunque_no_vea_cambios():
+    storage = UserStorage()
+    for nombre in ("ana", "bea", "cid"):
+        storage.crear_usuario(nombre, 2)
+    feed = ChangeFeed(storage.db, poll_interval=0.01, retention=1, compact_interval=0)
+    feed.start()
+
+    deadline = time.monotonic() + 5
+    with storage.db.reader() as conn:
+        while (conn.execute("SELECT COUNT(*) FROM users_changelog").fetchone()[0] > 1
+               and time.monotonic() < deadline):
+            time.sleep(0.01)
+        assert conn.execute("SELECT seq FROM users_changelog").fetchall() == [(3,)]
+    feed.stop()
+
+
+def test_importacion_masiva_compacta_el_registro(monkeypatch):
+    monkeypatch.setattr(AppSettings, 'CHANGELOG_RETENTION', 2)
+    storage = UserStorage()
+    storage.crear_usuarios_bulk([(f"usuario{i}", 2) for i in range(5)], chunk_size=2)
+
+    with storage.db.reader() as conn:
+        assert conn.execute("SELECT seq FROM users_changelog").fetchall() == [(4,), (5,)]
@@ -0,0 +1,209 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from storage.connection_pool import ConnectionManager
+from storage.local_db import LocalDB
+from storage.profiles import get_profile
+from storage.retry import DatabaseBusyError, RetryPolicy
+
+
+def test_pool_compartido_por_archivo(tmp_path):
+    manager = ConnectionManager()
+    ruta = str(tmp_path / "app.db")
+
+    assert manager.get_pool(ruta) is manager.get_pool(ruta)
+    manager.close_all()
+
+
+def test_shared_crea_un_solo_objeto(tmp_path):
+    manager = ConnectionManager()
+    pool = manager.get_pool(str(tmp_path / "app.db"))
+    llamadas = []
+    inicio = threading.Barrier(8)
+
+    def factory():
+        llamadas.append(1)
+        time.sleep(0.05)
+        return object()
+
+    def pedir():
+        inicio.wait()
+        resultados.append(pool.shared("clave", factory))
+
+    resultados = []
+    hilos = [threading.Thread(target=pedir) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert len(llamadas) == 1
+    assert all(r is resultados[0] for r in resultados)
+    manager.close_all()
+
+
+def test_una_lectora_por_hilo(tmp_path):
+    manager = ConnectionManager()
+    pool = manager.get_pool(str(tmp_path / "app.db"))
+
+    with pool.reader() as a, pool.reader() as b:
+        assert a is b
+        assert pool.stats().in_use == 2
+
+    otras = []
+    hilo = threading.Thread(target=lambda: otras.append(pool.connection()))
+    hilo.start()
+    hilo.join()
+
+    assert otras[0] is not pool.connection()
+    # La lectora del hilo terminado se cierra al consultar estadísticas
+    assert pool.stats().readers == 1
+    manager.close_all()
+
+
+def test_escritora_hace_commit_y_rollback(tmp_path):
+    manager = ConnectionManager()
+    pool = manager.get_pool(str(tmp_path / "app.db"))
+
+    with pool.writer() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+
+    try:
+        with pool.writer() as conn:
+            conn.execute("INSERT INTO t VALUES (2)")
+            raise RuntimeError("abortar")
+    except RuntimeError:
+        pass
+
+    with pool.reader() as conn:
+        assert conn.execute("SELECT x FROM t").fetchall() == [(1,)]
+
+    stats = pool.stats()
+    assert stats.waits == 2
+    assert stats.in_use == 0
+    assert stats.open == 2
+    manager.close_all()
+
+
+def test_perfil_aplica_pragmas(tmp_path):
+    manager = ConnectionManager()
+    pool = manager.get_pool(str(tmp_path / "app.db"))
+    pool.use_profile(get_profile('bulk-load'))
+
+    with pool.reader() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone() == ('wal',)
+        assert conn.execute("PRAGMA synchronous").fetchone() == (0,)
+
+    pool.use_profile(get_profile('durable'))
+    with pool.reader() as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone() == (2,)
+    manager.close_all()
+
+
+def test_perfil_compartido_por_el_pool():
+    durable = LocalDB(profile='durable')
+    assert LocalDB().profile.name == 'durable'
+    with pytest.raises(ValueError):
+        LocalDB(profile='bulk-load')
+
+    with durable.reader() as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone() == (2,)
+
+
+def test_perfil_desconocido():
+    with pytest.raises(ValueError):
+        get_profile('rapidisimo')
+
+
+def test_bases_en_memoria():
+    manager = ConnectionManager()
+    una = manager.get_pool(":memory:")
+    otra = manager.get_pool(":memory:")
+    assert una is not otra
+    assert una.memory
+
+    compartida = "file:compartida?mode=memory&cache=shared"
+    assert manager.get_pool(compartida, uri=True) is manager.get_pool(compartida, uri=True)
+
+    with una.writer() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+    with una.reader() as conn:
+        assert conn.execute("SELECT x FROM t").fetchall() == [(1,)]
+    manager.close_all()
+
+
+def test_solo_lectura(tmp_path):
+    manager = ConnectionManager()
+    ruta = str(tmp_path / "app.db")
+    with manager.get_pool(ruta).writer() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+
+    pool = manager.get_pool(ruta, read_only=True)
+    assert pool.read_only and pool is not manager.get_pool(ruta)
+    with pytest.raises(sqlite3.OperationalError):
+        with pool.writer() as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+    manager.close_all()
+
+
+def test_uri_del_mismo_archivo_comparte_pool(tmp_path):
+    manager = ConnectionManager()
+    ruta = tmp_path / "app.db"
+    with manager.get_pool(str(ruta)).writer() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+
+    assert manager.get_pool(f"file:{ruta}", uri=True) is manager.get_pool(str(ruta))
+    solo_lectura = manager.get_pool(f"file:{ruta}?cache=private", uri=True, read_only=True)
+    assert solo_lectura is manager.get_pool(str(ruta), read_only=True)
+    assert "mode=ro" in solo_lectura.database
+    with pytest.raises(sqlite3.OperationalError):
+        with solo_lectura.writer() as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+    manager.close_all()
+
+
+def test_reintenta_si_otro_proceso_bloquea(tmp_path):
+    manager = ConnectionManager()
+    ruta = str(tmp_path / "app.db")
+    pool = manager.get_pool(ruta, connect_options={'timeout': 0})
+    with pool.writer() as conn:
+        conn.execute("CREATE TABLE t (x)")
+
+    # Otra conexión, como la de otro proceso, retiene el lock de escritura
+    otro = sqlite3.connect(ruta, isolation_level=None, check_same_thread=False)
+    otro.execute("BEGIN IMMEDIATE")
+    intentos = []
+
+    def insertar(conn):
+        intentos.append(1)
+        return conn.execute("INSERT INTO t VALUES (1)").rowcount
+
+    with pytest.raises(DatabaseBusyError):
+        pool.run_in_transaction(insertar, RetryPolicy(attempts=2, base_delay=0.001))
+    # BEGIN IMMEDIATE falla antes de ejecutar nada
+    assert intentos == []
+    stats = pool.stats()
+    assert stats.busy_retries == 1 and stats.busy_failures == 1
+
+    liberar = threading.Timer(0.05, otro.execute, ("COMMIT",))
+    liberar.start()
+    politica = RetryPolicy(attempts=50, base_delay=0.01, max_delay=0.02)
+    assert pool.run_in_transaction(insertar, politica) == 1
+    liberar.join()
+    assert intentos == [1]
+    assert pool.stats().busy_retries > 1
+    otro.close()
+    manager.close_all()
+
+
+def test_backoff_con_jitter():
+    politica = RetryPolicy(attempts=3, base_delay=0.1, max_delay=0.3)
+    for intento, tope in ((1, 0.1), (2, 0.2), (3, 0.3), (8, 0.3)):
+        assert all(0 <= politica.delay(intento) <= tope for _ in range(50))
+    with pytest.raises(ValueError):
+        RetryPolicy(attempts=0)
@@ -0,0 +1,48 @@
+import json
+import logging
+
+from storage.instrumentation import QueryInstrumentation, normalize
+from storage.local_db import LocalDB
+from storage.user_storage import UserStorage
+
+
+def test_normalizar_sentencias():
+    assert normalize("SELECT *  FROM users\n WHERE id = 5 AND nombre = 'o''neil'") == (
+        "SELECT * FROM users WHERE id = ? AND nombre = ?"
+    )
+    assert normalize("SELECT 1 FROM t WHERE id IN (?, ?, ?)") == normalize(
+        "SELECT 1 FROM t WHERE id IN (?,?)"
+    )
+
+
+def test_estadisticas_por_sentencia():
+    storage = UserStorage(LocalDB(instrument=True))
+    storage.crear_usuario("ana", 2)
+    for _ in range(10):
+        storage.get_by_nombre("ana")
+
+    stats = {s.statement: s for s in storage.db.query_stats()}
+    consulta = stats["SELECT id, nombre, rol FROM users WHERE nombre = ?"]
+    assert consulta.count == 10
+    assert consulta.p50_ms <= consulta.p95_ms <= consulta.p99_ms <= consulta.max_ms
+
+
+def test_log_de_consultas_lentas_con_plan(caplog):
+    storage = UserStorage(LocalDB(instrument=True))
+    storage.db.pool.instrumentation.slow_query_ms = 0
+
+    with caplog.at_level(logging.WARNING, logger="storage.instrumentation"):
+        storage.get_by_nombre("ana")
+
+    mensaje = next(r.getMessage() for r in caplog.records if "WHERE nombre" in r.getMessage())
+    assert "idx_users_nombre" in mensaje
+
+
+def test_volcado_a_archivo(tmp_path):
+    instrumentation = QueryInstrumentation()
+    instrumentation.record(None, "SELECT 1", None, 0.002)
+    instrumentation.start_dumping(str(tmp_path / "stats.json"), interval=60)
+    instrumentation.stop()
+
+    data = json.loads((tmp_path / "stats.json").read_text())
+    assert data["statements"][0]["statement"] == "SELECT ?"
@@ -0,0 +1,51 @@
+import sqlite3
+
+import pytest
+
+from storage.migrations import SCHEMA_VERSION, get_version, migrar
+
+
+def test_migrar_base_nueva(tmp_path):
+    conn = sqlite3.connect(tmp_path / "app.db")
+
+    assert migrar(conn) == SCHEMA_VERSION
+    indices = {row[1] for row in conn.execute("PRAGMA index_list(users)")}
+    assert {"idx_users_nombre", "idx_users_rol_nombre"} <= indices
+
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM users WHERE nombre = ?", ("x",)
+    ).fetchall()
+    assert "idx_users_nombre" in plan[0][3]
+
+
+def test_migrar_base_al_dia_no_ejecuta_ddl(tmp_path):
+    conn = sqlite3.connect(tmp_path / "app.db")
+    migrar(conn)
+
+    sentencias = []
+    conn.set_trace_callback(sentencias.append)
+    migrar(conn)
+
+    assert sentencias == ["PRAGMA user_version"]
+
+
+def test_migrar_elimina_duplicados_previos(tmp_path):
+    conn = sqlite3.connect(tmp_path / "app.db")
+    conn.execute(
+        "CREATE TABLE users (id INTEGER PRIMARY KEY, nombre TEXT NOT NULL, "
+        "rol INTEGER NOT NULL)"
+    )
+    conn.executemany(
+        "INSERT INTO users (nombre, rol) VALUES (?, ?)",
+        [("admin", 1), ("admin", 1), ("ana", 2)]
+    )
+    conn.commit()
+
+    migrar(conn)
+
+    assert conn.execute("SELECT id, nombre FROM users").fetchall() == [
+        (1, "admin"), (3, "ana")
+    ]
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("INSERT INTO users (nombre, rol) VALUES ('ana', 2)")
+    assert get_version(conn) == SCHEMA_VERSION
@@ -0,0 +1,89 @@
+import sqlite3
+
+from storage.local_db import LocalDB
+from storage.name_filter import BloomFilter, NameFilter
+from storage.user_storage import UserStorage
+
+
+def test_bloom_sin_falsos_negativos():
+    bloom = BloomFilter(1000, 0.01)
+    nombres = [f"usuario{i}" for i in range(1000)]
+    for nombre in nombres:
+        bloom.add(nombre)
+
+    assert all(nombre in bloom for nombre in nombres)
+    falsos = sum(f"otro{i}" in bloom for i in range(10000))
+    assert falsos < 300
+
+
+def test_filtro_se_mantiene_con_escrituras():
+    storage = UserStorage()
+    storage.crear_usuario("ana", 2)
+    filtro = NameFilter.for_db(storage.db)
+    filtro.rebuild()
+
+    assert filtro.might_contain("ana")
+    assert not filtro.might_contain("nadie")
+
+    storage.crear_usuario("bea", 2)
+    storage.crear_usuarios_bulk([("cid", 1)])
+    assert filtro.might_contain("bea")
+    assert filtro.might_contain("cid")
+    assert filtro.rebuilds == 1
+    assert NameFilter.for_db(LocalDB()) is filtro
+
+
+def test_filtro_detecta_escrituras_de_otro_proceso():
+    storage = UserStorage()
+    filtro = NameFilter(storage.db, recheck_interval=0)
+    filtro.rebuild()
+    assert not filtro.might_contain("externo")
+
+    otro = sqlite3.connect("app.db")
+    otro.execute("INSERT INTO users (nombre, rol) VALUES ('externo', 2)")
+    otro.commit()
+    otro.close()
+
+    # Mientras se pone al día responde "quizás"
+    assert filtro.might_contain("externo")
+    assert filtro.wait(5)
+    assert filtro.might_contain("externo")
+    assert not filtro.might_contain("nadie")
+    # Los nombres nuevos se leen del registro, sin recorrer la tabla
+    assert filtro.rebuilds == 1
+
+
+def test_filtro_responde_quizas_mientras_se_construye():
+    storage = UserStorage()
+    storage.crear_usuario("ana", 2)
+    filtro = NameFilter(storage.db)
+
+    assert filtro.might_contain("nadie")
+    assert filtro.wait(5)
+    assert not filtro.might_contain("nadie")
+    assert filtro.rebuilds == 1
+
+
+def test_filtro_con_replica_lee_del_archivo():
+    storage = UserStorage(LocalDB(replica=True, max_staleness=60))
+    storage.crear_usuario("ana", 2)
+    assert storage.get_by_nombre("ana") is not None
+
+    otro = sqlite3.connect("app.db")
+    otro.execute("INSERT INTO users (nombre, rol) VALUES ('bea', 2)")
+    otro.commit()
+
+    # La réplica aún no ve a bea, pero el filtro sí
+    filtro = NameFilter(storage.db, recheck_interval=0)
+    filtro.rebuild()
+    assert storage.get_by_nombre("bea") is None
+    assert filtro.might_contain("bea")
+    assert not filtro.might_contain("nadie")
+
+    otro.execute("INSERT INTO users (nombre, rol) VALUES ('cid', 2)")
+    otro.commit()
+    otro.close()
+    assert filtro.might_contain("cid")
+    assert filtro.wait(5)
+    assert filtro.might_contain("cid")
+    assert not filtro.might_contain("nadie")
@@ -0,0 +1,72 @@
+import sqlite3
+import threading
+
+from storage.local_db import LocalDB
+from storage.user_storage import UserStorage
+
+
+def test_lecturas_desde_la_replica():
+    UserStorage().crear_usuario("previo", 2)
+    storage = UserStorage(LocalDB(replica=True, max_staleness=60))
+    replica = storage.db.replica
+
+    assert storage.get_by_nombre("previo").rol == 2
+    assert replica.full_syncs == 1
+
+    # Las escrituras del proceso se ven en la lectura siguiente
+    storage.crear_usuario("ana", 1)
+    storage.crear_usuarios_bulk([("previo", 1)], on_conflict='replace')
+    assert storage.get_by_nombre("ana").rol == 1
+    assert storage.get_by_nombre("previo").rol == 1
+    assert storage.count_by_rol() == {1: 2}
+    assert (replica.full_syncs, replica.applied) == (1, 2)
+
+
+def test_escrituras_de_otro_proceso_respetan_la_antiguedad():
+    storage = UserStorage(LocalDB(replica=True, max_staleness=60))
+    replica = storage.db.replica
+    assert storage.get_by_nombre("externo") is None
+
+    otro = sqlite3.connect("app.db")
+    otro.execute("INSERT INTO users (nombre, rol) VALUES ('externo', 2)")
+    otro.commit()
+    otro.close()
+
+    assert storage.get_by_nombre("externo") is None
+    replica.max_staleness = 0
+    assert storage.get_by_nombre("externo").nombre == "externo"
+
+
+def test_resincroniza_si_el_registro_se_compacto():
+    storage = UserStorage(LocalDB(replica=True, max_staleness=0))
+    storage.get_all()
+    escritor = UserStorage()
+    escritor.crear_usuarios_bulk([("ana", 2), ("bea", 2)], chunk_size=1)
+    with escritor.db.writer() as conn:
+        conn.execute("DELETE FROM users_changelog")
+
+    assert [u.nombre for u in storage.get_all()] == ["ana", "bea"]
+    assert storage.db.replica.full_syncs == 2
+
+
+def test_lecturas_simultaneas_desde_varios_hilos():
+    UserStorage().crear_usuario("ana", 2)
+    db = LocalDB(replica=True, max_staleness=60)
+    dentro = threading.Barrier(2, timeout=5)
+    conexiones = []
+
+    def leer():
+        with db.reader() as conn:
+            conexiones.append(conn)
+            # Los dos hilos tienen que estar leyendo a la vez para pasar
+            dentro.wait()
+            assert conn.execute("SELECT nombre FROM users").fetchall() == [("ana",)]
+
+    hilos = [threading.Thread(target=leer) for _ in range(2)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert len(conexiones) == 2 and conexiones[0] is not conexiones[1]
+    assert not dentro.broken
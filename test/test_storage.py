@@ -1,3 +1,7 @@
+import sqlite3
+
+import pytest
+
 from storage.user_storage import UserStorage
 
 
@@ -14,5 +18,164 @@ def test_storage():
         print(f"Usuario encontrado: {usuario.nombre}")
 
 
+def test_paginacion_por_clave():
+    storage = UserStorage()
+    for i, nombre in enumerate(["eva", "ana", "dan", "bea", "cid"]):
+        storage.crear_usuario(nombre, 1 if i % 2 else 2)
+
+    primera = storage.iter_page(limit=2, order_by='nombre')
+    assert [u.nombre for u in primera] == ["ana", "bea"]
+    segunda = storage.iter_page(after_id=primera[-1].id, limit=2, order_by='nombre')
+    assert [u.nombre for u in segunda] == ["cid", "dan"]
+
+    por_rol = [(u.rol, u.nombre) for u in storage.iter_all(batch_size=2, order_by='rol')]
+    assert por_rol == [(1, "ana"), (1, "bea"), (2, "cid"), (2, "dan"), (2, "eva")]
+
+    assert [u.id for u in storage.iter_all(batch_size=3)] == [1, 2, 3, 4, 5]
+
+
+def test_crear_usuarios_bulk_politicas():
+    storage = UserStorage()
+    storage.crear_usuario("admin", 1)
+
+    insertados = storage.crear_usuarios_bulk(
+        [("ana", 2), {"nombre": "bea", "rol": 1}, ("admin", 2)],
+        chunk_size=2,
+        on_conflict='skip'
+    )
+    assert insertados == 2
+    assert storage.get_by_nombre("admin").rol == 1
+
+    storage.crear_usuarios_bulk([("admin", 2)], on_conflict='replace')
+    admin = storage.get_by_nombre("admin")
+    assert (admin.id, admin.rol) == (1, 2)
+
+    with pytest.raises(sqlite3.IntegrityError):
+        storage.crear_usuarios_bulk([("zoe", 2), ("ana", 2)], on_conflict='fail')
+    assert storage.get_by_nombre("zoe") is None
+
+
+def test_buscar_por_prefijo():
+    storage = UserStorage()
+    storage.crear_usuarios_bulk(
+        [("Ana", 2), ("anabel", 2), ("ANDRES", 1), ("bob", 2), ("an", 2)]
+    )
+
+    assert [u.nombre for u in storage.buscar("an", limit=3)] == ["ANDRES", "Ana", "an"]
+    assert [u.nombre for u in storage.buscar("ANDR")] == ["ANDRES"]
+    assert storage.buscar("z") == []
+
+
+def test_conteos_mantenidos_por_triggers():
+    storage = UserStorage()
+    assert storage.count() == 0
+    assert storage.count_by_rol() == {}
+
+    storage.crear_usuarios_bulk([("ana", 1), ("bea", 2), ("cid", 2)])
+    storage.crear_usuarios_bulk([("cid", 1)], on_conflict='replace')
+
+    assert storage.count() == 3
+    assert storage.count_by_rol() == {1: 2, 2: 1}
+    assert storage.exists("bea")
+    assert not storage.exists("zoe")
+
+    with storage.db.writer() as conn:
+        conn.execute("DELETE FROM users WHERE nombre = 'bea'")
+    assert storage.count_by_rol() == {1: 2}
+
+
+def test_storage_en_memoria_no_toca_el_disco(tmp_path):
+    storage = UserStorage(database=":memory:")
+    storage.crear_usuario("ana", 1)
+
+    assert storage.get_by_nombre("ana").rol == 1
+    assert UserStorage(database=":memory:").get_by_nombre("ana") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_replica_de_solo_lectura():
+    UserStorage().crear_usuario("ana", 1)
+
+    replica = UserStorage(database="app.db", read_only=True)
+    assert replica.get_by_nombre("ana").rol == 1
+    with pytest.raises(sqlite3.OperationalError):
+        replica.crear_usuario("bea", 2)
+
+
+def test_busquedas_multiples(monkeypatch):
+    storage = UserStorage()
+    storage.crear_usuarios_bulk((f"u{i}", 2) for i in range(30))
+
+    por_nombre = storage.get_many_by_nombre(["u3", "u7", "nadie", "u3"])
+    assert {n: u.id for n, u in por_nombre.items()} == {"u3": 4, "u7": 8}
+
+    monkeypatch.setattr("storage.user_storage.MAX_KEYS_PER_STATEMENT", 4)
+    por_id = storage.get_many_by_id(range(1, 40))
+    assert len(por_id) == 30 and por_id[30].nombre == "u29"
+
+    monkeypatch.setattr("storage.user_storage.TEMP_TABLE_THRESHOLD", 5)
+    assert storage.get_many_by_id(range(1, 40)) == por_id
+    assert storage.get_many_by_nombre(["u0", "u1", "u2", "u3", "u4", "x"])["u4"].id == 5
+
+
+def test_pagina_tras_un_usuario_borrado():
+    storage = UserStorage()
+    storage.crear_usuarios_bulk([("c", 2), ("a", 1), ("d", 1), ("b", 2)])
+    primera = storage.iter_page(limit=2, order_by="nombre")
+    with storage.db.writer() as conn:
+        conn.execute("DELETE FROM users WHERE id IN (?, ?)", (primera[-1].id, 1))
+
+    # Por ID la clave es el propio ID, exista o no
+    assert [u.id for u in storage.iter_page(1, 2)] == [2, 3]
+    with pytest.raises(LookupError):
+        storage.iter_page(primera[-1].id, 2, "nombre")
+    assert [u.nombre for u in storage.iter_page(limit=2, order_by="nombre", after=primera[-1])] == ["d"]
+
+
+def test_busqueda_ordena_igual_que_la_lista():
+    storage = UserStorage()
+    storage.crear_usuarios_bulk([("bob", 2), ("Carla", 1), ("ana", 2)])
+
+    lista = [u.nombre for u in storage.iter_page(order_by="nombre")]
+    assert lista == ["Carla", "ana", "bob"]
+    assert [u.nombre for u in storage.buscar("", 10, "nombre")] == lista
+    assert [u.nombre for u in storage.buscar("", 10, "nombre", True)] == lista[::-1]
+
+
+def test_ventana_por_posicion():
+    storage = UserStorage()
+    storage.crear_usuarios_bulk([("c", 2), ("a", 1), ("b", 2)])
+
+    assert storage.get_window(1, 5) == [(2, "a", 1), (3, "b", 2)]
+    assert [fila[1] for fila in storage.get_window(0, 2, order_by="nombre")] == ["a", "b"]
+    assert storage.get_window(10, 5) == []
+
+
+def test_ventana_sigue_por_clave_desde_la_fila_anterior():
+    storage = UserStorage()
+    storage.crear_usuarios_bulk([("c", 2), ("a", 1), ("d", 1), ("b", 2)])
+    sentencias = []
+    storage.db.conn.set_trace_callback(sentencias.append)
+
+    assert storage.get_window(2, 2, "nombre", after_id=4) == [(1, "c", 2), (3, "d", 1)]
+    assert storage.get_window(2, 2, "rol", True, after_id=4) == [(3, "d", 1), (2, "a", 1)]
+    assert not [s for s in sentencias if "OFFSET" in s]
+    # Si la fila anterior ya no existe se salta con OFFSET
+    assert storage.get_window(2, 2, "nombre", after_id=99) == [(1, "c", 2), (3, "d", 1)]
+
+
+def test_orden_descendente():
+    storage = UserStorage()
+    storage.crear_usuarios_bulk([("b", 2), ("a", 1), ("d", 1), ("c", 2)])
+
+    assert [u.nombre for u in storage.iter_page(order_by="nombre", descending=True)] == ["d", "c", "b", "a"]
+    # La página siguiente continúa desde la clave del ID indicado
+    assert [u.nombre for u in storage.iter_page(4, 2, "rol", True)] == ["b", "d"]
+    assert [u.id for u in storage.iter_all(batch_size=3, descending=True)] == [4, 3, 2, 1]
+    assert storage.get_window(1, 2, "nombre", True) == [(4, "c", 2), (1, "b", 2)]
+    assert [u.nombre for u in storage.buscar("", 10, "rol", True)] == ["c", "b", "d", "a"]
+    assert list(storage.get_all_batch(order_by="nombre", descending=True).ids) == [3, 4, 1, 2]
+
+
 if __name__ == "__main__":
-    test_storage()
\ No newline at end of file
+    test_storage()
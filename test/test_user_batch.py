@@ -0,0 +1,35 @@
+import dataclasses
+
+import pytest
+
+from models.user import User
+from models.user_batch import UserBatch
+from storage.user_storage import UserStorage
+
+
+def test_user_inmutable_y_sin_dict():
+    user = User(1, "ana", 2)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        user.rol = 1
+    assert not hasattr(user, "__dict__")
+    assert User.from_dict({"id": 1, "nombre": "ana", "rol": 2}) == user
+
+
+def test_lote_columnar():
+    batch = UserBatch.from_row_batches([[(1, "ana", 1), (2, "", 2)], [(5, "bea", 2)]])
+
+    assert len(batch) == 3
+    assert list(batch.rows()) == [(1, "ana", 1), (2, "", 2), (5, "bea", 2)]
+    assert batch[-1] == User(5, "bea", 2)
+    assert [u.nombre for u in batch] == ["ana", "", "bea"]
+
+
+def test_get_all_batch():
+    storage = UserStorage()
+    storage.crear_usuarios_bulk((f"u{i}", 1 + i % 2) for i in range(25))
+
+    batch = storage.get_all_batch(batch_size=10)
+
+    assert list(batch) == storage.get_all()
+    assert batch.roles.tolist() == [1 + i % 2 for i in range(25)]
@@ -0,0 +1,63 @@
+import gzip
+import json
+
+from storage.local_db import LocalDB
+from storage.user_storage import UserStorage
+from storage.user_transfer import exportar, main
+
+
+def test_importar_csv_y_jsonl(tmp_path, capsys):
+    (tmp_path / "usuarios.csv").write_text("nombre,rol\nana,1\nbea,2\n")
+    (tmp_path / "usuarios.jsonl").write_text(
+        '{"nombre": "bea", "rol": 1}\n\n{"nombre": "cid"}\n'
+    )
+
+    assert main(["importar", "usuarios.csv"]) == 0
+    assert main(["importar", "usuarios.jsonl", "--on-conflict", "skip"]) == 0
+    assert "1 usuarios importados" in capsys.readouterr().out
+
+    storage = UserStorage(LocalDB(profile='bulk-load'))
+    assert [(u.nombre, u.rol) for u in storage.iter_all()] == [
+        ("ana", 1), ("bea", 2), ("cid", 2)
+    ]
+
+
+def test_importar_rol_vacio_y_errores_por_linea(tmp_path, capsys):
+    (tmp_path / "usuarios.csv").write_text("nombre,rol\nana,\n")
+    (tmp_path / "rol.csv").write_text("nombre,rol\nbea,1\ncid,admin\n")
+    (tmp_path / "sin_nombre.jsonl").write_text('{"nombre": "dan"}\n\n{"rol": 1}\n')
+
+    assert main(["importar", "usuarios.csv"]) == 0
+    assert main(["importar", "rol.csv"]) == 1
+    assert "línea 3: rol inválido 'admin'" in capsys.readouterr().err
+    assert main(["importar", "sin_nombre.jsonl"]) == 1
+    assert "línea 3: falta el nombre" in capsys.readouterr().err
+
+    # El lote con el error no se guarda
+    storage = UserStorage(LocalDB(profile='bulk-load'))
+    assert [(u.nombre, u.rol) for u in storage.iter_all()] == [("ana", 2)]
+
+
+def test_exportar_jsonl_comprimido(tmp_path):
+    storage = UserStorage()
+    storage.crear_usuarios_bulk([("ana", 1), ("bea", 2), ("cid", 2)])
+    avances = []
+
+    total = exportar("usuarios.jsonl.gz", storage, batch_size=2, progress=avances.append)
+
+    assert total == 3
+    assert avances == [2, 3]
+    with gzip.open(tmp_path / "usuarios.jsonl.gz", "rt", encoding="utf-8") as archivo:
+        assert [json.loads(linea)["nombre"] for linea in archivo] == ["ana", "bea", "cid"]
+
+
+def test_exportar_e_importar_csv():
+    # La orden abre app.db con su perfil por defecto, bulk-load
+    origen = UserStorage(LocalDB(profile='bulk-load'))
+    origen.crear_usuarios_bulk([("ana", 1), ("bea", 2)])
+
+    assert main(["exportar", "usuarios.csv"]) == 0
+    assert main(["--database", "copia.db", "importar", "usuarios.csv"]) == 0
+
+    copia = UserStorage(LocalDB("copia.db"))
+    assert [(u.nombre, u.rol) for u in copia.iter_all()] == [("ana", 1), ("bea", 2)]
@@ -0,0 +1,47 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from storage.user_storage import UserStorage
+from storage.write_queue import GroupCommitQueue
+
+
+def test_registros_concurrentes_en_un_commit():
+    storage = UserStorage(group_commit=True)
+    nombres = [f"u{i}" for i in range(50)]
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        usuarios = list(pool.map(lambda n: storage.crear_usuario(n, 2), nombres))
+
+    assert [u.nombre for u in usuarios] == nombres
+    assert {u.id for u in usuarios} == {storage.get_by_nombre(n).id for n in nombres}
+    assert storage.write_queue.rows == 50
+    assert storage.write_queue.batches < 50
+
+
+def test_un_listener_que_falla_no_detiene_la_cola():
+    storage = UserStorage(group_commit=True)
+
+    def listener(nombres):
+        raise RuntimeError("listener roto")
+    storage.db.add_write_listener(listener)
+
+    assert storage.crear_usuario_async("ana", 2).result(timeout=5).nombre == "ana"
+    assert storage.crear_usuario_async("bea", 2).result(timeout=5).nombre == "bea"
+    assert storage.write_queue.rows == 2
+
+
+def test_una_fila_fallida_no_afecta_al_lote():
+    storage = UserStorage()
+    storage.crear_usuario("ana", 2)
+    cola = GroupCommitQueue(storage.db, max_delay=0.05)
+
+    futuros = [cola.submit(n, 2) for n in ("bea", "ana", "cid")]
+
+    assert futuros[0].result().nombre == "bea"
+    with pytest.raises(sqlite3.IntegrityError):
+        futuros[1].result()
+    assert futuros[2].result().id == storage.get_by_nombre("cid").id
+    assert cola.batches == 1
+    cola.stop()
@@ -0,0 +1,73 @@
+import pytest
+
+from ui.components.virtual_table import RowCache
+
+
+def bloque(n, tamano=10):
+    return [(i,) for i in range(n * tamano, (n + 1) * tamano)]
+
+
+class TestRowCache:
+    def test_pide_cada_bloque_una_vez(self):
+        """Los bloques pedidos no se vuelven a pedir mientras llegan."""
+        cache = RowCache(block_size=10, max_blocks=4)
+
+        assert cache.missing(5, 25) == [0, 1, 2]
+        assert cache.missing(0, 30) == []
+        assert cache.get(5) is None
+
+        assert cache.put(0, bloque(0), cache.generation)
+        assert cache.get(5) == (5,)
+        assert cache.missing(0, 40) == [3]
+
+    def test_memoria_acotada(self):
+        """Sólo se conservan los bloques usados más recientemente."""
+        cache = RowCache(block_size=10, max_blocks=2)
+        for n in range(3):
+            cache.missing(n * 10, n * 10 + 1)
+            cache.put(n, bloque(n), cache.generation)
+
+        assert len(cache) == 2
+        assert cache.get(0) is None
+        assert cache.get(25) == (25,)
+
+    def test_clear_descarta_pedidos_anteriores(self):
+        """Un bloque pedido antes de clear() no entra en la caché."""
+        cache = RowCache(block_size=10)
+        cache.missing(0, 10)
+        generacion = cache.generation
+        cache.put(0, bloque(0), generacion)
+
+        cache.clear(keep_stale=True)
+        assert cache.get(3) == (3,)
+        assert not cache.put(0, [('viejo',)] * 10, generacion)
+        assert cache.missing(0, 10) == [0]
+
+        cache.put(0, [('nuevo',)] * 10, cache.generation)
+        assert cache.get(3) == ('nuevo',)
+
+        cache.clear()
+        assert cache.get(3) is None
+
+    def test_discard_permite_volver_a_pedir(self):
+        """Un pedido cancelado o fallido se puede repetir."""
+        cache = RowCache(block_size=10)
+        assert cache.missing(0, 10) == [0]
+        cache.discard(0, cache.generation)
+        assert cache.missing(0, 10) == [0]
+
+    def test_last_row_solo_de_bloques_completos(self):
+        """La fila para seguir por clave sale de un bloque actual y lleno."""
+        cache = RowCache(block_size=10)
+        cache.put(0, bloque(0), cache.generation)
+        cache.put(1, bloque(1)[:4], cache.generation)
+
+        assert cache.last_row(0) == (9,)
+        assert cache.last_row(1) is None
+        assert cache.last_row(2) is None
+        cache.clear(keep_stale=True)
+        assert cache.last_row(0) is None
+
+    def test_tamanos_invalidos(self):
+        with pytest.raises(ValueError):
+            RowCache(block_size=0)
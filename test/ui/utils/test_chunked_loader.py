@@ -0,0 +1,59 @@
+from test.ui.utils.test_task_runner import FakeWidget
+from ui.utils.chunked_loader import ChunkedLoader
+
+
+class TestChunkedLoader:
+    """Pruebas para ChunkedLoader."""
+
+    def test_primera_tanda_inmediata_y_resto_por_after(self):
+        """La primera pantalla se aplica en start() y el resto con after()."""
+        widget = FakeWidget()
+        loader = ChunkedLoader(widget, budget_ms=0, first_chunk=10)
+        aplicados, progreso, terminado = [], [], []
+
+        loader.start(
+            range(25),
+            aplicados.append,
+            on_progress=lambda hechos, total: progreso.append((hechos, total)),
+            on_done=lambda: terminado.append(True)
+        )
+        assert aplicados == list(range(10))
+        assert loader.running and widget.callbacks
+
+        widget.pump()
+        assert aplicados == list(range(25))
+        assert progreso[0] == (10, 25) and progreso[-1] == (25, 25)
+        assert len(progreso) > 2
+        assert terminado == [True] and not loader.running
+
+    def test_presupuesto_amplio_aplica_todo_de_una_vez(self):
+        widget = FakeWidget()
+        loader = ChunkedLoader(widget, budget_ms=1000, first_chunk=1)
+        aplicados = []
+        loader.start(range(100), aplicados.append)
+        assert len(aplicados) == 100 and not widget.callbacks
+
+    def test_cancelar_y_reiniciar(self):
+        widget = FakeWidget()
+        loader = ChunkedLoader(widget, budget_ms=0, first_chunk=1)
+        primera, segunda, terminado = [], [], []
+
+        loader.start(range(10), primera.append, on_done=lambda: terminado.append(1))
+        loader.start(range(3), segunda.append, on_done=lambda: terminado.append(2))
+        widget.pump()
+        assert primera == [0]
+        assert segunda == [0, 1, 2] and terminado == [2]
+
+        loader.start(range(10), primera.append)
+        loader.cancel()
+        widget.pump()
+        assert primera == [0, 0] and not loader.running
+
+    def test_se_cancela_al_destruir_el_widget(self):
+        widget = FakeWidget()
+        loader = ChunkedLoader(widget, budget_ms=0, first_chunk=1)
+        aplicados = []
+        loader.start(range(10), aplicados.append)
+        widget.destroy()
+        widget.pump()
+        assert aplicados == [0] and not loader.running
@@ -0,0 +1,99 @@
+import threading
+
+from test.ui.utils.test_task_runner import FakeWidget
+from ui.utils.paginator import Paginator
+from ui.utils.task_runner import TkTaskRunner
+
+
+class Fuente:
+    """Filas 0..total-1 que registran cada consulta."""
+
+    def __init__(self, total):
+        self.filas = [(i,) for i in range(total)]
+        self.consultas = []
+        self._lock = threading.Lock()
+
+    def fetch(self, offset, limit, after):
+        with self._lock:
+            self.consultas.append((offset, after))
+        if after is not None:
+            offset = after[0] + 1
+        return self.filas[offset:offset + limit]
+
+    def count(self):
+        return len(self.filas)
+
+
+def crear(total=95, **kwargs):
+    widget = FakeWidget()
+    fuente = Fuente(total)
+    mostradas = []
+    paginador = Paginator(
+        TkTaskRunner(widget),
+        lambda pagina, filas: mostradas.append((pagina, filas[0][0] if filas else None)),
+        page_size=10,
+        **kwargs
+    )
+    paginador.set_source(fuente.fetch, fuente.count)
+    widget.pump()
+    return widget, fuente, paginador, mostradas
+
+
+class TestPaginator:
+    """Pruebas para Paginator."""
+
+    def test_primera_pagina_y_precarga_de_la_siguiente(self):
+        """Tras mostrar una página, la siguiente ya está en memoria."""
+        widget, fuente, paginador, mostradas = crear()
+
+        assert paginador.pages == 10
+        assert mostradas == [(0, 0)]
+        assert paginador.cached(1)
+        # La siguiente se pidió por clave, desde la última fila de la primera
+        assert (10, (9,)) in fuente.consultas
+
+        consultas = len(fuente.consultas)
+        paginador.next()
+        assert mostradas[-1] == (1, 10)
+        assert fuente.consultas[consultas:] == []
+        widget.pump()
+        assert paginador.cached(2) and paginador.cached(0)
+
+    def test_ultima_y_limites(self):
+        widget, fuente, paginador, mostradas = crear()
+
+        paginador.last()
+        widget.pump()
+        assert mostradas[-1] == (9, 90)
+        assert paginador.cached(8)
+
+        paginador.next()
+        assert paginador.page == 9
+        paginador.first()
+        paginador.previous()
+        assert paginador.page == 0
+
+    def test_cache_acotada(self):
+        widget, fuente, paginador, mostradas = crear(cache_pages=3)
+        for _ in range(5):
+            paginador.next()
+            widget.pump()
+
+        assert sum(paginador.cached(p) for p in range(10)) == 3
+        assert paginador.cached(5) and paginador.cached(4) and paginador.cached(6)
+
+    def test_refresh_descarta_paginas_viejas(self):
+        widget, fuente, paginador, mostradas = crear(total=15)
+        assert paginador.pages == 2
+
+        fuente.filas = [(i,) for i in range(100, 105)]
+        paginador.next()
+        paginador.refresh()
+        widget.pump()
+        assert paginador.pages == 1
+        assert mostradas[-1] == (0, 100)
+
+    def test_tabla_vacia(self):
+        widget, fuente, paginador, mostradas = crear(total=0)
+        assert paginador.pages == 1
+        assert mostradas == [(0, None)]
@@ -0,0 +1,134 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from ui.utils.task_runner import TkTaskRunner
+
+
+class FakeWidget:
+    """Widget mínimo que ejecuta los after() cuando la prueba lo pide."""
+
+    def __init__(self):
+        self.callbacks = {}
+        self.bindings = []
+        self.errors = []
+        self._next = 0
+
+    def after(self, ms, callback):
+        self._next += 1
+        self.callbacks[self._next] = callback
+        return self._next
+
+    def after_cancel(self, after_id):
+        self.callbacks.pop(after_id, None)
+
+    def bind(self, sequence, callback, add=None):
+        self.bindings.append((sequence, callback))
+
+    def report_callback_exception(self, exc_type, exc, tb):
+        self.errors.append(exc)
+
+    def pump(self, timeout=2.0):
+        limite = time.monotonic() + timeout
+        while self.callbacks and time.monotonic() < limite:
+            after_id = min(self.callbacks)
+            self.callbacks.pop(after_id)()
+            time.sleep(0.001)
+
+    def destroy(self):
+        for sequence, callback in self.bindings:
+            if sequence == '<Destroy>':
+                callback(SimpleNamespace(widget=self))
+
+
+class TestTkTaskRunner:
+    """Pruebas para TkTaskRunner."""
+
+    def test_resultado_en_hilo_del_widget(self):
+        """Verifica que on_success corra en el hilo que consulta la cola."""
+        widget = FakeWidget()
+        runner = TkTaskRunner(widget)
+        recibidos = []
+
+        runner.submit(
+            threading.get_ident,
+            on_success=lambda r: recibidos.append((r, threading.get_ident()))
+        )
+        widget.pump()
+
+        (worker, ui), = recibidos
+        assert worker != ui == threading.get_ident()
+        assert not runner.busy
+
+    def test_errores(self):
+        """Verifica que los errores lleguen a on_error o al widget."""
+        widget = FakeWidget()
+        runner = TkTaskRunner(widget)
+        errores = []
+
+        runner.submit(lambda: 1 / 0, on_error=errores.append)
+        runner.submit(lambda: 1 / 0)
+        widget.pump()
+
+        assert isinstance(errores[0], ZeroDivisionError)
+        assert isinstance(widget.errors[0], ZeroDivisionError)
+
+    def test_destruir_descarta_resultados(self):
+        """Verifica que al destruir el widget no se entreguen resultados."""
+        widget = FakeWidget()
+        runner = TkTaskRunner(widget)
+        liberar = threading.Event()
+        recibidos = []
+
+        runner.submit(liberar.wait, on_success=recibidos.append)
+        widget.destroy()
+        liberar.set()
+        widget.pump(timeout=0.1)
+
+        assert recibidos == []
+        assert not widget.callbacks
+
+    def test_cancelar_tarea_en_curso(self):
+        """Verifica que cancel() descarte el resultado de una tarea en curso."""
+        widget = FakeWidget()
+        runner = TkTaskRunner(widget)
+        empezo = threading.Event()
+        liberar = threading.Event()
+        recibidos = []
+
+        def trabajo():
+            empezo.set()
+            liberar.wait()
+            return "viejo"
+
+        tarea = runner.submit(trabajo, on_success=recibidos.append)
+        empezo.wait()
+        runner.cancel(tarea)
+        runner.submit(lambda: "nuevo", on_success=recibidos.append)
+        liberar.set()
+        widget.pump()
+
+        assert recibidos == ["nuevo"]
+
+    def test_suscripcion_entrega_en_hilo_del_widget(self):
+        """Verifica que los avisos de otra fuente lleguen por la cola."""
+        widget = FakeWidget()
+        runner = TkTaskRunner(widget)
+        suscriptores = []
+        recibidos = []
+
+        def subscribe(callback):
+            suscriptores.append(callback)
+            return lambda: suscriptores.remove(callback)
+
+        runner.subscribe(subscribe, lambda *args: recibidos.append(args))
+        hilo = threading.Thread(target=suscriptores[0], args=("cambio",))
+        hilo.start()
+        hilo.join()
+        assert recibidos == []
+
+        widget.callbacks.pop(min(widget.callbacks))()
+        assert recibidos == [("cambio",)]
+
+        widget.destroy()
+        assert suscriptores == []
@@ -0,0 +1,126 @@
+import random
+
+from ui.utils.tree_sync import TreeSync
+
+
+class FakeTree:
+    """Treeview plano que registra las llamadas que recibe."""
+
+    def __init__(self):
+        self.children = []
+        self.values = {}
+        self.calls = []
+        self.top = 0.0
+
+    def insert(self, parent, index, iid, values):
+        self.calls.append('insert')
+        index = len(self.children) if index == 'end' else index
+        self.children.insert(index, iid)
+        self.values[iid] = values
+
+    def move(self, iid, parent, index):
+        # Como ttk: el índice se cuenta sin el propio item
+        self.calls.append('move')
+        self.children.remove(iid)
+        self.children.insert(index, iid)
+
+    def delete(self, *iids):
+        self.calls.append('delete')
+        for iid in iids:
+            self.children.remove(iid)
+            del self.values[iid]
+
+    def item(self, iid, values):
+        self.calls.append('item')
+        self.values[iid] = values
+
+    def yview(self):
+        return (self.top, 1.0)
+
+    def yview_moveto(self, fraction):
+        self.calls.append('yview')
+        self.top = fraction
+
+
+def filas(*ids):
+    return [(i, f"u{i}", "Usuario") for i in ids]
+
+
+class TestTreeSync:
+    def test_carga_inicial_y_sin_cambios(self):
+        """Repetir el mismo resultado no toca el Treeview."""
+        tree = FakeTree()
+        sync = TreeSync(tree)
+        sync.sync(filas(1, 2, 3))
+        assert tree.children == ['1', '2', '3']
+
+        tree.calls.clear()
+        assert sync.sync(filas(1, 2, 3)) == 0
+        assert tree.calls == []
+
+    def test_costo_proporcional_al_cambio(self):
+        """Agregar un usuario a una tabla grande es una sola inserción."""
+        tree = FakeTree()
+        sync = TreeSync(tree)
+        ids = list(range(1, 1001))
+        sync.sync(filas(*ids))
+        tree.calls.clear()
+
+        sync.sync(filas(*ids[:500], 5000, *ids[500:]))
+        assert tree.calls == ['insert']
+        assert tree.children[500] == '5000'
+
+    def test_borrados_en_una_llamada_y_actualizaciones(self):
+        tree = FakeTree()
+        sync = TreeSync(tree)
+        sync.sync(filas(1, 2, 3, 4, 5))
+        tree.calls.clear()
+
+        sync.sync([(1, "u1", "Administrador")] + filas(3, 5))
+        assert tree.calls == ['delete', 'item']
+        assert tree.children == ['1', '3', '5']
+        assert tree.values['1'] == (1, "u1", "Administrador")
+
+    def test_mueve_el_minimo(self):
+        """Llevar una fila del principio al final es un solo move."""
+        tree = FakeTree()
+        sync = TreeSync(tree)
+        sync.sync(filas(3, 1, 2))
+        tree.calls.clear()
+
+        sync.sync(filas(1, 2, 3))
+        assert tree.calls.count('move') == 1
+        assert tree.children == ['1', '2', '3']
+
+    def test_reordenamientos_aleatorios(self):
+        tree = FakeTree()
+        sync = TreeSync(tree)
+        azar = random.Random(7)
+        for _ in range(50):
+            ids = azar.sample(range(40), azar.randint(0, 30))
+            sync.sync(filas(*ids))
+            assert tree.children == [str(i) for i in ids]
+            assert len(sync) == len(ids)
+
+    def test_scroll_anclado_a_la_primera_fila_visible(self):
+        tree = FakeTree()
+        sync = TreeSync(tree)
+        sync.sync(filas(*range(10)))
+        tree.top = 0.5  # la fila 5 es la primera visible
+
+        sync.sync(filas(*range(-10, 10)))
+        assert tree.children[int(tree.top * 20)] == '5'
+
+    def test_cambios_sueltos(self):
+        tree = FakeTree()
+        sync = TreeSync(tree)
+        sync.upsert((1, "a", "Usuario"))
+        sync.upsert((2, "b", "Usuario"))
+        sync.upsert((1, "a", "Administrador"))
+        sync.delete(2)
+        sync.delete(99)
+        assert tree.children == ['1']
+        assert tree.values['1'] == (1, "a", "Administrador")
+
+        sync.clear()
+        assert tree.children == [] and len(sync) == 0
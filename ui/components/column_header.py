@@ -1,9 +1,8 @@
-import tkinter as tk
 from tkinter import ttk
 from ui.config.settings import AppSettings
 
 
-class ColumnHeader(tk.Frame):
+class ColumnHeader(ttk.Frame):
     def __init__(
             self,
             parent,
@@ -13,17 +12,15 @@ class ColumnHeader(tk.Frame):
             width=None,
             **kwargs
     ):
+        # Configure frame (style and padding are ttk-only options)
+        kwargs.setdefault('style', 'Header.TFrame')
+        kwargs.setdefault('padding', (AppSettings.PADDING['small'], 2))
         super().__init__(parent, **kwargs)
 
         # Store attributes
         self.sort_command = sort_command
         self.sort_direction = None  # None, 'asc', or 'desc'
-
-        # Configure frame
-        self.configure(
-            style='Header.TFrame',
-            padding=(AppSettings.PADDING['small'], 2)
-        )
+        self.sort_indicator = None
 
         # Create header label
         self.label = ttk.Label(
@@ -62,18 +59,23 @@ class ColumnHeader(tk.Frame):
 
         # Toggle sort direction
         if self.sort_direction is None:
-            self.sort_direction = 'asc'
+            self.set_sort('asc')
         elif self.sort_direction == 'asc':
-            self.sort_direction = 'desc'
+            self.set_sort('desc')
         else:
-            self.sort_direction = None
-
-        # Update sort indicator
-        self._update_sort_indicator()
+            self.set_sort(None)
 
         # Call sort command
-        if self.sort_command:
-            self.sort_command(self.sort_direction)
+        self.sort_command(self.sort_direction)
+
+    def set_sort(self, direction):
+        """Show a sort direction without calling sort_command.
+
+        Used to clear the indicator when another column takes over the sort.
+        """
+        self.sort_direction = direction
+        if self.sort_indicator is not None:
+            self._update_sort_indicator()
 
     def _update_sort_indicator(self):
         if self.sort_direction == 'asc':
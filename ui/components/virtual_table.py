@@ -0,0 +1,380 @@
+from collections import OrderedDict
+from tkinter import ttk
+from typing import Callable, Sequence
+
+from ui.config.settings import AppSettings
+
+# Valores que se muestran mientras llega el bloque de una fila
+PLACEHOLDER = '…'
+
+
+class RowCache:
+    """Filas de una tabla virtual guardadas por bloques de tamaño fijo.
+
+    Sólo se conservan los `max_blocks` bloques usados más recientemente,
+    así que la memoria no depende del tamaño de la tabla. Cada clear()
+    cambia la generación para descartar los bloques que se pidieron antes.
+    """
+
+    def __init__(self, block_size: int = 200, max_blocks: int = 32):
+        if block_size < 1 or max_blocks < 1:
+            raise ValueError("block_size y max_blocks deben ser mayores que cero")
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.generation = 0
+        self._blocks: OrderedDict[int, Sequence] = OrderedDict()
+        self._stale: dict[int, Sequence] = {}
+        self._pending: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def get(self, index: int):
+        """Fila en la posición `index`, o None si su bloque no está cargado."""
+        block, position = divmod(index, self.block_size)
+        rows = self._blocks.get(block)
+        if rows is None:
+            rows = self._stale.get(block)
+        if rows is None or position >= len(rows):
+            return None
+        return rows[position]
+
+    def last_row(self, block: int):
+        """Última fila del bloque si está cargado y completo, o None.
+
+        No se consideran los bloques que conserva un refresco: sus filas
+        pueden haber cambiado de posición.
+        """
+        rows = self._blocks.get(block)
+        if rows is None or len(rows) < self.block_size:
+            return None
+        return rows[-1]
+
+    def missing(self, start: int, stop: int) -> list[int]:
+        """Bloques de las filas [start, stop) que falta pedir.
+
+        Los retorna marcados como pedidos y deja los que ya están cargados
+        como los más recientes.
+        """
+        result = []
+        if stop <= start:
+            return result
+        for block in range(start // self.block_size, (stop - 1) // self.block_size + 1):
+            if block in self._blocks:
+                self._blocks.move_to_end(block)
+            elif block not in self._pending:
+                self._pending.add(block)
+                result.append(block)
+        return result
+
+    def put(self, block: int, rows: Sequence, generation: int) -> bool:
+        """Guarda un bloque pedido en la generación `generation`.
+
+        Returns:
+            bool: False si el bloque es de una generación anterior y se
+            descartó.
+        """
+        if generation != self.generation:
+            return False
+        self._pending.discard(block)
+        self._stale.pop(block, None)
+        self._blocks[block] = rows
+        self._blocks.move_to_end(block)
+        while len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+        return True
+
+    def discard(self, block: int, generation: int):
+        """Olvida un pedido que falló o se canceló para volver a pedirlo."""
+        if generation == self.generation:
+            self._pending.discard(block)
+
+    def clear(self, keep_stale: bool = False):
+        """Vacía la caché.
+
+        Args:
+            keep_stale: Sigue mostrando los bloques actuales hasta que
+                llegue su reemplazo, para que un refresco no parpadee.
+        """
+        self.generation += 1
+        self._stale = dict(self._blocks) if keep_stale else {}
+        self._blocks.clear()
+        self._pending.clear()
+
+
+class VirtualTable(ttk.Frame):
+    """Treeview con scroll virtual para tablas de cualquier tamaño.
+
+    Sólo existen como items las filas visibles: al desplazarse se reciclan
+    cambiando sus valores. Las filas se piden por bloques a
+    `fetch(offset, limit, after)` en segundo plano, a medida que se mueve
+    el scroll, y se guardan en una RowCache acotada; además de los bloques
+    visibles se piden `overscan` bloques a cada lado. `after` es la última
+    fila del bloque anterior si está en caché (al avanzar, la consulta
+    puede seguir por clave en lugar de saltar filas con OFFSET) o None.
+
+    La primera columna de cada fila es su clave: la selección la sigue
+    aunque el item que la muestra cambie.
+    """
+
+    def __init__(
+            self,
+            parent,
+            columns: Sequence[str],
+            tasks,
+            fetch: Callable[[int, int, Sequence | None], Sequence] | None = None,
+            count: Callable[[], int] | None = None,
+            widths: dict | None = None,
+            block_size: int | None = None,
+            max_blocks: int | None = None,
+            overscan: int = 1,
+            on_error: Callable[[BaseException], None] | None = None,
+            **tree_options
+    ):
+        """
+        Args:
+            columns: Nombres de las columnas.
+            tasks: TkTaskRunner con el que se consultan las filas.
+            fetch: fetch(offset, limit, after) retorna hasta `limit` filas
+                desde la posición `offset`. Se llama fuera del hilo de Tk.
+            count: Retorna la cantidad total de filas, fuera del hilo de Tk.
+            widths: Ancho por columna.
+            block_size: Filas por consulta. Por defecto
+                AppSettings.VIRTUAL_TABLE_BLOCK.
+            max_blocks: Bloques en memoria. Por defecto
+                AppSettings.VIRTUAL_TABLE_MAX_BLOCKS.
+            overscan: Bloques que se piden por delante y por detrás de los
+                visibles.
+            on_error: Recibe los errores de fetch y count.
+        """
+        super().__init__(parent)
+        self.tasks = tasks
+        self.columns = tuple(columns)
+        self.overscan = overscan
+        self.on_error = on_error
+        self.cache = RowCache(
+            block_size or AppSettings.VIRTUAL_TABLE_BLOCK,
+            max_blocks or AppSettings.VIRTUAL_TABLE_MAX_BLOCKS
+        )
+        self.first = 0
+        self.total = 0
+        self._fetch = fetch
+        self._count = count
+        self._count_task = None
+        self._requests: dict = {}
+        self._slots: list[str] = []
+        self._slot_rows: list = []
+        self._selected_key = None
+
+        tree_options.setdefault('show', 'headings')
+        self.tree = ttk.Treeview(
+            self,
+            columns=self.columns,
+            selectmode='browse',
+            **tree_options
+        )
+        for col in self.columns:
+            self.tree.heading(col, text=col)
+            if widths and col in widths:
+                self.tree.column(col, width=widths[col], stretch=False)
+
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self._on_scrollbar)
+
+        self.tree.bind('<Configure>', self._on_configure)
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', self._on_mousewheel)
+        self.tree.bind('<Button-5>', self._on_mousewheel)
+        self.tree.bind('<Prior>', lambda e: self._scroll_pages(-1))
+        self.tree.bind('<Next>', lambda e: self._scroll_pages(1))
+
+        self.tree.pack(side='left', fill='both', expand=True)
+        self.scrollbar.pack(side='right', fill='y')
+
+        if fetch is not None and count is not None:
+            self.refresh()
+
+    @property
+    def visible(self) -> int:
+        """Cantidad de filas que caben en la tabla."""
+        return len(self._slots)
+
+    def set_source(
+            self,
+            fetch: Callable[[int, int, Sequence | None], Sequence],
+            count: Callable[[], int]
+    ):
+        """Cambia de dónde salen las filas y vuelve al principio."""
+        self._fetch = fetch
+        self._count = count
+        self.first = 0
+        self._selected_key = None
+        self.refresh(keep_rows=False)
+
+    def refresh(self, keep_rows: bool = True):
+        """Vuelve a contar y pedir las filas, por ejemplo tras un cambio.
+
+        Args:
+            keep_rows: Muestra las filas anteriores hasta que lleguen las
+                nuevas en lugar de dejarlas en blanco.
+        """
+        self._cancel_requests()
+        self.cache.clear(keep_stale=keep_rows)
+        if self._count_task is not None:
+            self.tasks.cancel(self._count_task)
+        self._count_task = self.tasks.submit(
+            self._count,
+            on_success=self._on_count,
+            on_error=self._report
+        )
+
+    def scroll_to(self, index: int):
+        """Desplaza la tabla para que `index` sea la primera fila visible."""
+        first = max(0, min(index, self.total - self.visible))
+        if first != self.first:
+            self.first = first
+            self._render()
+
+    def selected_row(self):
+        """Fila seleccionada, si está visible."""
+        for slot in self.tree.selection():
+            return self._slot_rows[self._slots.index(slot)]
+        return None
+
+    def _on_count(self, total: int):
+        self._count_task = None
+        self.total = total
+        self.first = max(0, min(self.first, total - self.visible))
+        self._render()
+
+    def _render(self):
+        total = self.total
+        selected = None
+        for i, slot in enumerate(self._slots):
+            index = self.first + i
+            if index >= total:
+                self._slot_rows[i] = None
+                self.tree.detach(slot)
+                continue
+            row = self.cache.get(index)
+            self._slot_rows[i] = row
+            self.tree.move(slot, '', i)
+            self.tree.item(slot, values=row if row is not None else (PLACEHOLDER,))
+            if row is not None and self._selected_key is not None and row[0] == self._selected_key:
+                selected = slot
+        if selected is not None:
+            self.tree.selection_set(selected)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        self._request_rows()
+
+    def _request_rows(self):
+        margin = self.overscan * self.cache.block_size
+        start = max(0, self.first - margin)
+        stop = min(self.total, self.first + self.visible + margin)
+        block_size = self.cache.block_size
+        wanted = range(start // block_size, (stop - 1) // block_size + 1) if stop > start else range(0)
+
+        # Los bloques que ya salieron de la zona visible no se esperan
+        for block in [b for b in self._requests if b not in wanted]:
+            self.tasks.cancel(self._requests.pop(block))
+            self.cache.discard(block, self.cache.generation)
+
+        # Los bloques visibles se piden antes que los de overscan
+        visibles = self.cache.missing(self.first, min(self.total, self.first + self.visible))
+        for block in visibles + self.cache.missing(start, stop):
+            self._request(block)
+
+    def _request(self, block: int):
+        generation = self.cache.generation
+        size = self.cache.block_size
+
+        def on_error(error):
+            self._requests.pop(block, None)
+            self.cache.discard(block, generation)
+            self._report(error)
+
+        self._requests[block] = self.tasks.submit(
+            self._fetch,
+            block * size,
+            size,
+            self.cache.last_row(block - 1) if block else None,
+            on_success=lambda rows: self._on_rows(block, generation, rows),
+            on_error=on_error
+        )
+
+    def _on_rows(self, block: int, generation: int, rows: Sequence):
+        self._requests.pop(block, None)
+        if not self.cache.put(block, rows, generation):
+            return
+        size = self.cache.block_size
+        if block * size < self.first + self.visible and (block + 1) * size > self.first:
+            self._render()
+
+    def _cancel_requests(self):
+        for future in self._requests.values():
+            self.tasks.cancel(future)
+        self._requests.clear()
+
+    def _report(self, error: BaseException):
+        if self.on_error is not None:
+            self.on_error(error)
+        else:
+            self.report_callback_exception(type(error), error, error.__traceback__)
+
+    def _resize(self, rows: int):
+        while len(self._slots) < rows:
+            self._slots.append(self.tree.insert('', 'end', values=()))
+            self._slot_rows.append(None)
+        while len(self._slots) > rows:
+            self.tree.delete(self._slots.pop())
+            self._slot_rows.pop()
+        self.first = max(0, min(self.first, self.total - rows))
+        self._render()
+
+    def _on_configure(self, event):
+        style = self.tree.cget('style') or 'Treeview'
+        try:
+            row_height = int(ttk.Style(self).lookup(style, 'rowheight') or 20)
+        except ValueError:
+            row_height = 20
+        rows = event.height // row_height
+        if 'headings' in str(self.tree.cget('show')):
+            # El encabezado ocupa aproximadamente una fila
+            rows -= 1
+        rows = max(1, rows)
+        if rows != self.visible:
+            self._resize(rows)
+
+    def _on_select(self, event):
+        # Las selecciones que hace _render mantienen la misma clave
+        row = self.selected_row()
+        if row is not None:
+            self._selected_key = row[0]
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(value) * self.total))
+        elif unit == 'pages':
+            self._scroll_pages(int(value))
+        else:
+            self.scroll_to(self.first + int(value))
+
+    def _scroll_pages(self, pages: int):
+        self.scroll_to(self.first + pages * max(1, self.visible - 1))
+        return 'break'
+
+    def _on_mousewheel(self, event):
+        if event.num == 4:
+            step = -3
+        elif event.num == 5:
+            step = 3
+        else:
+            step = -3 if event.delta > 0 else 3
+        self.scroll_to(self.first + step)
+        return 'break'
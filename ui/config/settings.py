@@ -26,6 +26,52 @@ class AppSettings:
 
     # Table settings
     TABLE_ROWS_PER_PAGE = 10
+    SEARCH_DEBOUNCE = 250  # milliseconds
+    SEARCH_MAX_RESULTS = 200
+    USERS_VIEW_MODE = 'virtual'  # 'virtual', 'paginas' o 'lista' (todas las filas en el Treeview)
+    TABLE_PAGE_CACHE = 5  # páginas en memoria en el modo 'paginas'
+    VIRTUAL_TABLE_BLOCK = 200  # filas por consulta de la tabla virtual
+    VIRTUAL_TABLE_MAX_BLOCKS = 32  # bloques en memoria como máximo
+    TABLE_LOAD_BUDGET = 8  # milliseconds por tanda al llenar la lista
+    TABLE_LOAD_FIRST_ROWS = 50  # filas de la primera tanda
+    TABLE_LOAD_CHUNKED_FROM = 2000  # filas nuevas a partir de las que se carga por tandas
+
+    # Database settings
+    DATABASE_PATH = 'app.db'  # ruta, ':memory:' o URI 'file:' (ver LocalDB)
+    DATABASE_PROFILE = 'balanced'  # 'durable', 'balanced' o 'bulk-load'
+
+    # Escrituras con varios procesos: espera de SQLite por el lock y
+    # reintentos con backoff cuando aun así sigue ocupado
+    DATABASE_BUSY_TIMEOUT = 5000  # milliseconds
+    WRITE_RETRY_ATTEMPTS = 5
+    WRITE_RETRY_BASE_DELAY = 0.01  # seconds
+    WRITE_RETRY_MAX_DELAY = 1.0  # seconds
+
+    # Réplica en memoria para lecturas (ver storage.replica)
+    DATABASE_REPLICA = False
+    REPLICA_MAX_STALENESS = 1.0  # seconds
+
+    # Instrumentación de consultas (ver storage.instrumentation)
+    QUERY_INSTRUMENTATION = False
+    SLOW_QUERY_MS = 100
+    QUERY_STATS_PATH = None  # p. ej. 'query_stats.json'
+    QUERY_STATS_INTERVAL = 60  # seconds
+
+    # Registro de cambios de users (ver storage.change_feed)
+    CHANGELOG_RETENTION = 100_000  # cambios que se conservan al compactar
+    CHANGELOG_COMPACT_INTERVAL = 60  # seconds
+    CHANGE_FEED_MAX_BATCH = 1000  # con más cambios pendientes las vistas recargan todo
+
+    # Group commit: registros que llegan juntos se confirman en un commit
+    GROUP_COMMIT = False
+    GROUP_COMMIT_MAX_BATCH = 256
+    GROUP_COMMIT_WINDOW = 5  # milliseconds
+
+    # Login cache settings
+    LOGIN_CACHE_SIZE = 256
+    LOGIN_CACHE_TTL = 300  # seconds
+    LOGIN_NAME_FILTER = True
+    LOGIN_FILTER_FALSE_POSITIVE_RATE = 0.01
 
     # Timeout settings (in milliseconds)
     SESSION_TIMEOUT = 30 * 60 * 1000  # 30 minutes
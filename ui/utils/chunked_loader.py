@@ -0,0 +1,119 @@
+import time
+from typing import Callable, Sequence
+
+from ui.config.settings import AppSettings
+
+
+class ChunkedLoader:
+    """Procesa muchos elementos en el hilo de Tk sin congelar la ventana.
+
+    Los elementos se aplican por tandas programadas con after(): cada
+    tanda se corta al agotar su presupuesto de tiempo, y entre tanda y
+    tanda Tk atiende eventos y redibuja. La primera tanda aplica siempre
+    `first_chunk` elementos, para que la primera pantalla aparezca de
+    inmediato.
+
+    Si el widget dueño se destruye, la carga en curso se cancela.
+    """
+
+    def __init__(
+            self,
+            widget,
+            budget_ms: float | None = None,
+            first_chunk: int | None = None
+    ):
+        """
+        Args:
+            widget: Widget con el que se programan las tandas.
+            budget_ms: Milisegundos por tanda. Por defecto
+                AppSettings.TABLE_LOAD_BUDGET.
+            first_chunk: Elementos de la primera tanda. Por defecto
+                AppSettings.TABLE_LOAD_FIRST_ROWS.
+        """
+        self.widget = widget
+        self.budget = (AppSettings.TABLE_LOAD_BUDGET if budget_ms is None
+                       else budget_ms) / 1000
+        self.first_chunk = (AppSettings.TABLE_LOAD_FIRST_ROWS if first_chunk is None
+                            else first_chunk)
+        self._items: Sequence = ()
+        self._apply = None
+        self._on_progress = None
+        self._on_done = None
+        self._done = 0
+        self._after_id = None
+        widget.bind('<Destroy>', self._on_destroy, add='+')
+
+    @property
+    def running(self) -> bool:
+        return self._apply is not None
+
+    @property
+    def done(self) -> int:
+        """Elementos aplicados en la carga actual o la última."""
+        return self._done
+
+    def start(
+            self,
+            items: Sequence,
+            apply: Callable,
+            on_progress: Callable[[int, int], None] | None = None,
+            on_done: Callable[[], None] | None = None
+    ):
+        """Aplica apply(item) a cada elemento, por tandas.
+
+        Cancela la carga anterior si aún no había terminado.
+
+        Args:
+            on_progress: Recibe (aplicados, total) después de cada tanda.
+            on_done: Se llama al terminar, no si se cancela.
+        """
+        self.cancel()
+        self._items = items
+        self._apply = apply
+        self._on_progress = on_progress
+        self._on_done = on_done
+        self._done = 0
+        self._step(self.first_chunk)
+
+    def cancel(self):
+        """Detiene la carga en curso; lo ya aplicado queda como está."""
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self._apply = None
+        self._items = ()
+
+    def _step(self, minimum: int = 1):
+        self._after_id = None
+        items, apply, total = self._items, self._apply, len(self._items)
+        deadline = time.perf_counter() + self.budget
+        done = self._done
+        stop = min(total, done + max(1, minimum))
+        while done < total:
+            apply(items[done])
+            done += 1
+            if done >= stop and time.perf_counter() >= deadline:
+                break
+        self._done = done
+
+        if self._on_progress is not None:
+            self._on_progress(done, total)
+        if self._apply is not apply:
+            # on_progress canceló o reinició la carga
+            return
+        if done < total:
+            self._after_id = self.widget.after(1, self._step)
+            return
+        on_done = self._on_done
+        self._apply = None
+        self._items = ()
+        if on_done is not None:
+            on_done()
+
+    def _on_destroy(self, event):
+        # <Destroy> también llega por cada hijo de una ventana
+        if event.widget is self.widget:
+            self.cancel()
@@ -0,0 +1,165 @@
+from collections import OrderedDict
+from typing import Callable, Sequence
+
+from ui.config.settings import AppSettings
+
+
+class Paginator:
+    """Navegación por páginas con caché y precarga de las vecinas.
+
+    Las páginas se piden en segundo plano con un TkTaskRunner llamando a
+    `fetch(offset, limit, after)`, donde `after` es la última fila de la
+    página anterior si está en caché (para seguir con paginación por clave
+    en lugar de saltar filas con OFFSET) o None.
+
+    Se guardan las `cache_pages` páginas usadas más recientemente. Cada
+    vez que se muestra una página se precargan la anterior y la
+    siguiente, así que al avanzar o retroceder la página ya está en
+    memoria y on_page se llama de inmediato.
+    """
+
+    def __init__(
+            self,
+            tasks,
+            on_page: Callable[[int, Sequence], None],
+            fetch: Callable[[int, int, Sequence | None], Sequence] | None = None,
+            count: Callable[[], int] | None = None,
+            page_size: int | None = None,
+            cache_pages: int | None = None,
+            on_error: Callable[[BaseException], None] | None = None
+    ):
+        """
+        Args:
+            tasks: TkTaskRunner con el que se consultan las páginas.
+            on_page: Recibe (página, filas) en el hilo de Tk cada vez que
+                cambia la página mostrada o su contenido.
+            fetch: Retorna las filas de una página; se llama fuera del
+                hilo de Tk.
+            count: Retorna la cantidad total de filas, fuera del hilo de Tk.
+            page_size: Filas por página. Por defecto
+                AppSettings.TABLE_ROWS_PER_PAGE.
+            cache_pages: Páginas en memoria. Por defecto
+                AppSettings.TABLE_PAGE_CACHE; nunca menos de 3 (la actual
+                y sus vecinas).
+            on_error: Recibe los errores de fetch y count.
+        """
+        self.tasks = tasks
+        self.on_page = on_page
+        self.on_error = on_error
+        self.page_size = page_size or AppSettings.TABLE_ROWS_PER_PAGE
+        self.cache_pages = max(3, cache_pages or AppSettings.TABLE_PAGE_CACHE)
+        self.page = 0
+        self.total = 0
+        self._fetch = fetch
+        self._count = count
+        self._cache: OrderedDict[int, Sequence] = OrderedDict()
+        self._pending: dict = {}
+        self._count_task = None
+        self._generation = 0
+
+    @property
+    def pages(self) -> int:
+        """Cantidad de páginas; una tabla vacía tiene una página vacía."""
+        return max(1, -(-self.total // self.page_size))
+
+    def set_source(
+            self,
+            fetch: Callable[[int, int, Sequence | None], Sequence],
+            count: Callable[[], int]
+    ):
+        """Cambia de dónde salen las filas y vuelve a la primera página."""
+        self._fetch = fetch
+        self._count = count
+        self.page = 0
+        self.refresh()
+
+    def refresh(self):
+        """Descarta la caché, vuelve a contar y muestra la página actual."""
+        self._generation += 1
+        for future in self._pending.values():
+            self.tasks.cancel(future)
+        self._pending.clear()
+        self._cache.clear()
+        if self._count_task is not None:
+            self.tasks.cancel(self._count_task)
+        self._count_task = self.tasks.submit(
+            self._count,
+            on_success=self._on_count,
+            on_error=self._report
+        )
+
+    def show(self, page: int):
+        """Muestra `page` (desde 0), desde la caché si ya está cargada."""
+        self.page = max(0, min(page, self.pages - 1))
+        rows = self._cache.get(self.page)
+        if rows is None:
+            self._request(self.page)
+            return
+        self._cache.move_to_end(self.page)
+        self.on_page(self.page, rows)
+        self._prefetch()
+
+    def first(self):
+        self.show(0)
+
+    def previous(self):
+        self.show(self.page - 1)
+
+    def next(self):
+        self.show(self.page + 1)
+
+    def last(self):
+        self.show(self.pages - 1)
+
+    def cached(self, page: int) -> bool:
+        return page in self._cache
+
+    def _on_count(self, total: int):
+        self._count_task = None
+        self.total = total
+        self.show(self.page)
+
+    def _prefetch(self):
+        for page in (self.page + 1, self.page - 1):
+            if 0 <= page < self.pages:
+                self._request(page)
+
+    def _request(self, page: int):
+        if page in self._cache or page in self._pending:
+            return
+        previous = self._cache.get(page - 1)
+        after = previous[-1] if previous else None
+        generation = self._generation
+
+        def on_error(error):
+            self._pending.pop(page, None)
+            self._report(error)
+
+        self._pending[page] = self.tasks.submit(
+            self._fetch,
+            page * self.page_size,
+            self.page_size,
+            after,
+            on_success=lambda rows: self._on_rows(page, generation, rows),
+            on_error=on_error
+        )
+
+    def _on_rows(self, page: int, generation: int, rows: Sequence):
+        if generation != self._generation:
+            return
+        self._pending.pop(page, None)
+        self._cache[page] = rows
+        self._cache.move_to_end(page)
+        while len(self._cache) > self.cache_pages:
+            self._cache.popitem(last=False)
+        if page == self.page:
+            self.on_page(page, rows)
+            self._prefetch()
+
+    def _report(self, error: BaseException):
+        if self.on_error is not None:
+            self.on_error(error)
+        else:
+            self.tasks.widget.report_callback_exception(
+                type(error), error, error.__traceback__
+            )
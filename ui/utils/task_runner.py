@@ -0,0 +1,173 @@
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Pool de hilos compartido por todas las ventanas."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=4,
+                thread_name_prefix='ui-task'
+            )
+        return _executor
+
+
+class TkTaskRunner:
+    """Ejecuta trabajo fuera del hilo de Tk y entrega el resultado en él.
+
+    Las funciones se ejecutan en un pool de hilos. Al terminar, su
+    resultado se deja en una cola que el hilo de Tk consulta con after(),
+    así que los callbacks on_success/on_error siempre corren en el bucle
+    de eventos y pueden tocar widgets.
+
+    Cuando el widget dueño se destruye, las tareas pendientes se cancelan
+    y los resultados de las que ya estaban en curso se descartan.
+    """
+
+    def __init__(self, widget, poll_interval: int = 15):
+        """
+        Args:
+            widget: Widget dueño de las tareas (normalmente la ventana).
+            poll_interval: Milisegundos entre consultas a la cola mientras
+                hay tareas en curso.
+        """
+        self.widget = widget
+        self.poll_interval = poll_interval
+        self._results: queue.SimpleQueue = queue.SimpleQueue()
+        self._pending: set[Future] = set()
+        self._calls: queue.SimpleQueue = queue.SimpleQueue()
+        self._unsubscribes: list[Callable[[], None]] = []
+        self._after_id = None
+        self._closed = False
+        widget.bind('<Destroy>', self._on_destroy, add='+')
+
+    def submit(
+            self,
+            fn: Callable,
+            *args,
+            on_success: Callable | None = None,
+            on_error: Callable[[BaseException], None] | None = None,
+            **kwargs
+    ) -> Future:
+        """Ejecuta fn(*args, **kwargs) en segundo plano.
+
+        Args:
+            on_success: Recibe el resultado, en el hilo de Tk.
+            on_error: Recibe la excepción, en el hilo de Tk. Si se omite,
+                se informa con report_callback_exception del widget.
+
+        Returns:
+            Future: Identifica la tarea para cancelarla con cancel().
+        """
+        if self._closed:
+            raise RuntimeError("El widget dueño de las tareas ya no existe")
+        future = get_executor().submit(fn, *args, **kwargs)
+        self._pending.add(future)
+        future.add_done_callback(
+            lambda f: self._results.put((f, on_success, on_error))
+        )
+        self._schedule()
+        return future
+
+    def subscribe(
+            self,
+            subscribe: Callable[[Callable], Callable[[], None]],
+            callback: Callable
+    ):
+        """Entrega en el hilo de Tk los avisos de una fuente de eventos.
+
+        Args:
+            subscribe: Registra un callable que la fuente llamará desde
+                cualquier hilo y retorna la función para darlo de baja
+                (por ejemplo, ChangeFeed.subscribe).
+            callback: Recibe los mismos argumentos, en el hilo de Tk.
+
+        La suscripción se da de baja al destruirse el widget.
+        """
+        if self._closed:
+            raise RuntimeError("El widget dueño de las tareas ya no existe")
+        self._unsubscribes.append(
+            subscribe(lambda *args: self._calls.put((callback, args)))
+        )
+        self._schedule()
+
+    def cancel(self, future: Future):
+        """Cancela una tarea; si ya está en curso, descarta su resultado."""
+        future.cancel()
+        self._pending.discard(future)
+
+    def cancel_all(self):
+        """Cancela las tareas pendientes y descarta las que están en curso."""
+        for future in list(self._pending):
+            future.cancel()
+        self._pending.clear()
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._pending)
+
+    def _schedule(self):
+        if self._after_id is None and not self._closed:
+            self._after_id = self.widget.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        self._after_id = None
+        while True:
+            try:
+                callback, args = self._calls.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                self.widget.report_callback_exception(type(e), e, e.__traceback__)
+            if self._closed:
+                return
+        while True:
+            try:
+                future, on_success, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if future not in self._pending or future.cancelled():
+                continue
+            self._pending.discard(future)
+            error = future.exception()
+            try:
+                if error is None:
+                    if on_success:
+                        on_success(future.result())
+                elif on_error:
+                    on_error(error)
+                else:
+                    self.widget.report_callback_exception(
+                        type(error), error, error.__traceback__
+                    )
+            except Exception as e:
+                self.widget.report_callback_exception(type(e), e, e.__traceback__)
+            if self._closed:
+                return
+        if self._pending or self._unsubscribes:
+            self._schedule()
+
+    def _on_destroy(self, event):
+        # <Destroy> también llega por cada hijo de una ventana
+        if event.widget is not self.widget:
+            return
+        self._closed = True
+        self.cancel_all()
+        for unsubscribe in self._unsubscribes:
+            unsubscribe()
+        self._unsubscribes.clear()
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
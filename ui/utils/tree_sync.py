@@ -0,0 +1,149 @@
+from typing import Iterable, Sequence
+
+
+def _stable(positions: list[int]) -> set[int]:
+    """Índices de una subsecuencia creciente más larga de `positions`.
+
+    Los items que la forman ya están en orden relativo correcto y no
+    necesitan moverse.
+    """
+    tails: list[int] = []
+    previous = [-1] * len(positions)
+    for i, position in enumerate(positions):
+        lo, hi = 0, len(tails)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if positions[tails[mid]] < position:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo:
+            previous[i] = tails[lo - 1]
+        if lo == len(tails):
+            tails.append(i)
+        else:
+            tails[lo] = i
+    result = set()
+    i = tails[-1] if tails else -1
+    while i != -1:
+        result.add(i)
+        i = previous[i]
+    return result
+
+
+class TreeSync:
+    """Mantiene un Treeview plano igual a una lista de filas con clave.
+
+    La primera columna de cada fila es su clave y el iid de su item.
+    sync() compara con lo que ya se muestra y sólo emite los delete,
+    insert, move e item necesarios, así que el costo en llamadas a Tcl es
+    proporcional al cambio y no al tamaño de la tabla. Como los items
+    conservan su iid, la selección se mantiene, y el scroll sigue anclado
+    a la primera fila visible.
+
+    Los valores de cada item se recuerdan aquí para no tener que leerlos
+    del Treeview; los cambios sobre la tabla deben pasar por esta clase.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._order: list[str] = []
+        self._values: dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def sync(self, rows: Iterable[Sequence]) -> int:
+        """Deja en la tabla exactamente `rows`, en ese orden.
+
+        Returns:
+            int: Cantidad de llamadas al Treeview que hicieron falta.
+        """
+        new_values = {str(row[0]): tuple(row) for row in rows}
+        new_order = list(new_values)
+        anchor = self._first_visible()
+        anchor_index = self._order.index(anchor) if anchor is not None else None
+        calls = 0
+
+        # Los borrados van en una sola llamada
+        removed = [iid for iid in self._order if iid not in new_values]
+        if removed:
+            self.tree.delete(*removed)
+            calls += 1
+            for iid in removed:
+                del self._values[iid]
+            removed_set = set(removed)
+            self._order = [iid for iid in self._order if iid not in removed_set]
+
+        index_of = {iid: i for i, iid in enumerate(new_order)}
+        stable = _stable([index_of[iid] for iid in self._order])
+        fixed = {self._order[i] for i in stable}
+
+        order = self._order
+        structural = bool(removed)
+        placed = -1  # posición de la fila anterior si se acaba de colocar
+        for i, iid in enumerate(new_order):
+            values = new_values[iid]
+            if iid in fixed:
+                placed = -1
+            else:
+                # Va justo después de la fila anterior en el orden nuevo
+                if placed >= 0:
+                    position = placed + 1
+                else:
+                    position = order.index(new_order[i - 1]) + 1 if i else 0
+                if iid in self._values:
+                    current = order.index(iid)
+                    order.pop(current)
+                    if current < position:
+                        position -= 1
+                    self.tree.move(iid, '', position)
+                else:
+                    self.tree.insert('', position, iid=iid, values=values)
+                order.insert(position, iid)
+                placed = position
+                calls += 1
+                structural = True
+            if self._values.get(iid, values) != values:
+                self.tree.item(iid, values=values)
+                calls += 1
+            self._values[iid] = values
+
+        self._order = new_order
+        if (structural and anchor in index_of
+                and index_of[anchor] != anchor_index):
+            self.tree.yview_moveto(index_of[anchor] / len(new_order))
+            calls += 1
+        return calls
+
+    def upsert(self, row: Sequence):
+        """Actualiza la fila de esa clave o la agrega al final."""
+        iid, values = str(row[0]), tuple(row)
+        if iid in self._values:
+            if self._values[iid] != values:
+                self.tree.item(iid, values=values)
+        else:
+            self.tree.insert('', 'end', iid=iid, values=values)
+            self._order.append(iid)
+        self._values[iid] = values
+
+    def delete(self, key):
+        """Quita la fila de esa clave, si está."""
+        iid = str(key)
+        if iid in self._values:
+            self.tree.delete(iid)
+            del self._values[iid]
+            self._order.remove(iid)
+
+    def clear(self):
+        """Vacía la tabla con una sola llamada."""
+        if self._order:
+            self.tree.delete(*self._order)
+        self._order = []
+        self._values = {}
+
+    def _first_visible(self) -> str | None:
+        if not self._order:
+            return None
+        top = self.tree.yview()[0]
+        return self._order[min(len(self._order) - 1, round(top * len(self._order)))]
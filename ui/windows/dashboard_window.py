@@ -1,10 +1,12 @@
 import tkinter as tk
 from tkinter import ttk
 from models.user import User
+from services.auth_service import AuthService
 from ui.components.styled_button import StyledButton
 from ui.components.scrolled_frame import ScrolledFrame
 from ui.styles.colors import ColorScheme
 from ui.config.settings import AppSettings
+from ui.utils.task_runner import TkTaskRunner
 
 
 class DashboardWindow(tk.Toplevel):
@@ -12,6 +14,8 @@ class DashboardWindow(tk.Toplevel):
         super().__init__()
 
         self.usuario = usuario
+        self.auth_service = AuthService()
+        self.tasks = TkTaskRunner(self)
         self.title(f"Dashboard - {usuario.nombre}")
         self.geometry("400x300")
         self.configure(bg=ColorScheme.BACKGROUND)
@@ -26,6 +30,9 @@ class DashboardWindow(tk.Toplevel):
         # Información del usuario
         self.crear_seccion_usuario()
 
+        # Resumen de usuarios
+        self.crear_seccion_resumen()
+
         # Botones de acción según rol
         self.crear_botones_rol()
 
@@ -62,6 +69,45 @@ class DashboardWindow(tk.Toplevel):
             font=AppSettings.get_font('default')
         ).pack(anchor='w', pady=(2, 0))
 
+    def crear_seccion_resumen(self):
+        frame_resumen = ttk.LabelFrame(
+            self.frame,
+            text="Resumen",
+            padding=AppSettings.PADDING['medium'],
+            style="Custom.TLabelframe"
+        )
+        frame_resumen.pack(fill='x', pady=AppSettings.PADDING['small'])
+
+        self.resumen_label = ttk.Label(
+            frame_resumen,
+            text="Cargando...",
+            style="Custom.TLabel",
+            font=AppSettings.get_font('default'),
+            justify='left'
+        )
+        self.resumen_label.pack(anchor='w')
+
+        self.cargar_resumen()
+
+    def cargar_resumen(self):
+        # Los conteos salen de la tabla de resumen: no recorren users
+        self.tasks.submit(
+            self.auth_service.get_user_counts,
+            on_success=self.mostrar_resumen,
+            on_error=lambda e: self.resumen_label.configure(
+                text="No se pudo cargar el resumen"
+            )
+        )
+
+    def mostrar_resumen(self, conteos):
+        roles = {1: "Administradores", 2: "Usuarios"}
+        lineas = [f"Total: {sum(conteos.values())}"]
+        lineas += [
+            f"{roles.get(rol, f'Rol {rol}')}: {total}"
+            for rol, total in conteos.items()
+        ]
+        self.resumen_label.configure(text="\n".join(lineas))
+
     def crear_botones_rol(self):
         frame_botones = ttk.Frame(
             self.frame,
@@ -6,6 +6,7 @@ from ui.components.styled_button import StyledButton
 from ui.components.custom_dialog import CustomDialog
 from ui.styles.colors import ColorScheme
 from ui.config.settings import AppSettings
+from ui.utils.task_runner import TkTaskRunner
 
 
 class LoginWindow(tk.Tk):
@@ -13,6 +14,7 @@ class LoginWindow(tk.Tk):
         super().__init__()
 
         self.auth_service = AuthService()
+        self.tasks = TkTaskRunner(self)
         self.title("Login")
         self.geometry("300x150")
         self.configure(bg=ColorScheme.BACKGROUND)
@@ -41,12 +43,13 @@ class LoginWindow(tk.Tk):
         self.nombre_entry.pack(pady=AppSettings.PADDING['small'])
 
         # Botón de ingreso
-        StyledButton(
+        self.login_button = StyledButton(
             frame,
             text="Ingresar",
             command=self.login,
             button_type='primary'
-        ).pack(pady=AppSettings.PADDING['medium'])
+        )
+        self.login_button.pack(pady=AppSettings.PADDING['medium'])
 
         # Centrar la ventana
         self.center_window()
@@ -61,7 +64,18 @@ class LoginWindow(tk.Tk):
             self.show_error("Por favor ingrese un nombre")
             return
 
-        usuario = self.auth_service.login(nombre)
+        # La consulta corre fuera del hilo de Tk; el botón queda
+        # deshabilitado hasta recibir la respuesta
+        self.login_button.configure(state='disabled')
+        self.tasks.submit(
+            self.auth_service.login,
+            nombre,
+            on_success=self.on_login,
+            on_error=self.on_login_error
+        )
+
+    def on_login(self, usuario):
+        self.login_button.configure(state='normal')
         if usuario:
             self.withdraw()  # Oculta la ventana de login
             dashboard = DashboardWindow(usuario)
@@ -72,6 +86,10 @@ class LoginWindow(tk.Tk):
         else:
             self.show_error("Usuario no encontrado")
 
+    def on_login_error(self, error):
+        self.login_button.configure(state='normal')
+        self.show_error(str(error))
+
     def show_error(self, message):
         CustomDialog(
             self,
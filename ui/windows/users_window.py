@@ -1,12 +1,24 @@
 import tkinter as tk
+from functools import partial
 from tkinter import ttk
+from models.user_batch import UserBatch
 from services.auth_service import AuthService
+from storage.retry import DatabaseBusyError
 from ui.components.styled_button import StyledButton
 from ui.components.scrolled_frame import ScrolledFrame
 from ui.components.custom_dialog import CustomDialog
 from ui.components.column_header import ColumnHeader
+from ui.components.virtual_table import VirtualTable
 from ui.styles.colors import ColorScheme
 from ui.config.settings import AppSettings
+from ui.utils.chunked_loader import ChunkedLoader
+from ui.utils.paginator import Paginator
+from ui.utils.task_runner import TkTaskRunner
+from ui.utils.tree_sync import TreeSync
+
+
+# Orden en storage para cada columna ordenable
+COLUMNAS_ORDEN = {'ID': 'id', 'Nombre': 'nombre', 'Rol': 'rol'}
 
 
 class UsersWindow(tk.Toplevel):
@@ -16,6 +28,14 @@ class UsersWindow(tk.Toplevel):
         self.geometry("500x400")
         self.configure(bg=ColorScheme.BACKGROUND)
         self.auth_service = AuthService()
+        self.tasks = TkTaskRunner(self)
+        self._busqueda_after = None
+        self._busqueda_task = None
+        self._cambios_pendientes = False
+        # None: por ID en la lista y por nombre en las búsquedas
+        self.orden = None
+        self.descendente = False
+        self._reordenar = False
 
         # Frame principal con scroll
         self.main_frame = ScrolledFrame(self)
@@ -30,6 +50,11 @@ class UsersWindow(tk.Toplevel):
         # Formulario de nuevo usuario
         self.crear_formulario()
 
+        # Cambios hechos desde otras ventanas o procesos
+        self.tasks.subscribe(
+            self.auth_service.subscribe_changes, self.aplicar_cambios
+        )
+
         # Centrar la ventana
         self.center_window()
 
@@ -43,20 +68,74 @@ class UsersWindow(tk.Toplevel):
         )
         list_frame.pack(fill='both', expand=True)
 
-        # Crear Treeview con estilo personalizado
+        # Búsqueda por prefijo de nombre
+        busqueda_frame = ttk.Frame(list_frame, style="Custom.TFrame")
+        busqueda_frame.pack(fill='x', pady=(0, AppSettings.PADDING['small']))
+
+        ttk.Label(
+            busqueda_frame,
+            text="Buscar:",
+            style="Custom.TLabel",
+            font=AppSettings.get_font('default')
+        ).pack(side='left')
+
+        self.busqueda_var = tk.StringVar()
+        self.busqueda_entry = ttk.Entry(
+            busqueda_frame,
+            textvariable=self.busqueda_var,
+            style="Custom.TEntry",
+            font=AppSettings.get_font('default')
+        )
+        self.busqueda_entry.pack(
+            side='left', fill='x', expand=True, padx=(AppSettings.PADDING['small'], 0)
+        )
+        self.busqueda_var.trace_add('write', self.on_busqueda_cambiada)
+
         columns = ('ID', 'Nombre', 'Rol')
+        column_widths = {'ID': 80, 'Nombre': 200, 'Rol': 120}
+
+        # Encabezados ordenables: el orden se resuelve en storage
+        self.encabezados_frame = self.crear_encabezados(list_frame, columns, column_widths)
+        self.encabezados_frame.pack(fill='x')
+
+        # Con tablas grandes sólo se crean items para las filas visibles
+        self.tabla = None
+        if AppSettings.USERS_VIEW_MODE == 'virtual':
+            self.tabla = VirtualTable(
+                list_frame,
+                columns,
+                self.tasks,
+                widths=column_widths,
+                on_error=lambda e: self.show_error(str(e)),
+                show='',
+                style="Custom.Treeview"
+            )
+            self.tree = self.tabla.tree
+            self.tabla.pack(fill='both', expand=True)
+            self.cargar_usuarios()
+            return
+
+        # Crear Treeview con estilo personalizado
         self.tree = ttk.Treeview(
             list_frame,
             columns=columns,
-            show='headings',
+            show='',
             style="Custom.Treeview"
         )
 
-        # Configurar columnas con headers personalizados
-        column_widths = {'ID': 80, 'Nombre': 200, 'Rol': 120}
+        self.tree_sync = TreeSync(self.tree)
+
+        # Las cargas grandes se insertan por tandas sin congelar la ventana
+        self.cargador = ChunkedLoader(self)
+        self.progreso_label = ttk.Label(
+            list_frame,
+            style="Custom.TLabel",
+            font=AppSettings.get_font('default')
+        )
+
+        # Anchos fijos para que coincidan con los encabezados
         for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=column_widths[col])
+            self.tree.column(col, width=column_widths[col], stretch=False)
 
         # Agregar scrollbar
         scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
@@ -66,6 +145,66 @@ class UsersWindow(tk.Toplevel):
         self.tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
 
+        # Modo por páginas: las vecinas se precargan en segundo plano
+        self.paginador = None
+        if AppSettings.USERS_VIEW_MODE == 'paginas':
+            self.tree.configure(height=AppSettings.TABLE_ROWS_PER_PAGE)
+            self.paginador = Paginator(
+                self.tasks,
+                self.mostrar_pagina,
+                on_error=lambda e: self.show_error(str(e))
+            )
+            self.crear_navegacion(list_frame)
+
+        self.cargar_usuarios()
+
+    def crear_navegacion(self, parent):
+        frame = ttk.Frame(parent, style="Custom.TFrame")
+        frame.pack(side='bottom', fill='x', pady=(AppSettings.PADDING['small'], 0), before=self.tree)
+
+        self.nav_botones = {}
+        for texto, comando in (
+                ("«", self.paginador.first),
+                ("‹", self.paginador.previous),
+                ("›", self.paginador.next),
+                ("»", self.paginador.last),
+        ):
+            boton = StyledButton(frame, text=texto, command=comando, button_type='secondary')
+            boton.pack(side='left', padx=2)
+            self.nav_botones[texto] = boton
+
+        self.pagina_label = ttk.Label(
+            frame,
+            style="Custom.TLabel",
+            font=AppSettings.get_font('default')
+        )
+        self.pagina_label.pack(side='left', padx=AppSettings.PADDING['small'])
+
+    def crear_encabezados(self, parent, columns, column_widths):
+        frame = ttk.Frame(parent, style="Custom.TFrame")
+        self.encabezados = {}
+        for i, col in enumerate(columns):
+            header = ColumnHeader(
+                frame,
+                text=col,
+                sortable=True,
+                sort_command=partial(self.ordenar, col)
+            )
+            header.grid(row=0, column=i, sticky='ew')
+            frame.columnconfigure(i, minsize=column_widths[col])
+            self.encabezados[col] = header
+        return frame
+
+    def ordenar(self, columna, direccion):
+        # Sólo una columna ordena a la vez
+        for col, header in self.encabezados.items():
+            if col != columna:
+                header.set_sort(None)
+        if direccion is None:
+            self.orden, self.descendente = None, False
+        else:
+            self.orden, self.descendente = COLUMNAS_ORDEN[columna], direccion == 'desc'
+        self._reordenar = True
         self.cargar_usuarios()
 
     def crear_formulario(self):
@@ -123,35 +262,198 @@ class UsersWindow(tk.Toplevel):
             )
             self.nombre_entry.grid(row=row, column=1, padx=5, pady=5)
 
+    def on_busqueda_cambiada(self, *args):
+        # Se espera a que el usuario deje de escribir antes de consultar
+        if self._busqueda_after is not None:
+            self.after_cancel(self._busqueda_after)
+        self._busqueda_after = self.after(
+            AppSettings.SEARCH_DEBOUNCE, self.cargar_usuarios
+        )
+
     def cargar_usuarios(self):
-        # Limpiar lista actual
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self._busqueda_after = None
+        # Una búsqueda nueva deja obsoleta la anterior si aún no terminó
+        if self._busqueda_task is not None:
+            self.tasks.cancel(self._busqueda_task)
+
+        prefijo = self.busqueda_var.get().strip()
+        if self.tabla is not None and not prefijo:
+            self._busqueda_task = None
+            self.tabla.set_source(
+                partial(self.leer_ventana, order_by=self.orden or 'id', descending=self.descendente),
+                self.auth_service.count_users
+            )
+        elif self.paginador is not None and not prefijo:
+            self._busqueda_task = None
+            self.paginador.set_source(
+                partial(self.leer_ventana, order_by=self.orden or 'id', descending=self.descendente),
+                self.auth_service.count_users
+            )
+        elif prefijo:
+            self._busqueda_task = self.tasks.submit(
+                self.auth_service.buscar_usuarios,
+                prefijo,
+                AppSettings.SEARCH_MAX_RESULTS,
+                self.orden or 'nombre',
+                self.descendente,
+                on_success=self.mostrar_usuarios,
+                on_error=lambda e: self.show_error(str(e))
+            )
+        else:
+            self._busqueda_task = self.tasks.submit(
+                self.auth_service.get_users_batch,
+                self.orden or 'id',
+                self.descendente,
+                on_success=self.mostrar_usuarios,
+                on_error=lambda e: self.show_error(str(e))
+            )
 
-        # Recargar usuarios
-        for user in self.auth_service.get_all_users():
-            rol_texto = "Administrador" if user.rol == 1 else "Usuario"
-            self.tree.insert('', 'end', values=(user.id, user.nombre, rol_texto))
+    def leer_ventana(self, offset, limit, after, order_by='id', descending=False):
+        # Corre fuera del hilo de Tk: las filas llegan ya formateadas.
+        # Con el bloque anterior a mano se sigue por clave en lugar de OFFSET.
+        return [
+            (id, nombre, self.rol_texto(rol))
+            for id, nombre, rol in self.auth_service.get_users_window(
+                offset, limit, order_by, descending,
+                after[0] if after is not None else None
+            )
+        ]
 
-    def registrar_usuario(self):
-        try:
-            nombre = self.nombre_entry.get()
-            rol = 1 if self.rol_combo.get() == "Administrador" else 2
+    def mostrar_pagina(self, pagina, filas):
+        self.tree_sync.sync(filas)
+        self.pagina_label.configure(
+            text=f"Página {pagina + 1} de {self.paginador.pages} ({self.paginador.total:,} usuarios)"
+        )
+        ultima = pagina >= self.paginador.pages - 1
+        for texto, deshabilitado in (("«", pagina == 0), ("‹", pagina == 0), ("›", ultima), ("»", ultima)):
+            self.nav_botones[texto].configure(state='disabled' if deshabilitado else 'normal')
+
+    def mostrar_usuarios(self, usuarios):
+        if self.tabla is not None:
+            filas = [self.valores_fila(u) for u in usuarios]
+            self.tabla.set_source(lambda o, l, a: filas[o:o + l], lambda: len(filas))
+            return
+        if self.paginador is not None:
+            filas = [self.valores_fila(u) for u in usuarios]
+            self.paginador.set_source(lambda o, l, a: filas[o:o + l], lambda: len(filas))
+            return
+
+        self.cargador.cancel()
+        self.progreso_label.pack_forget()
+        if self._reordenar and len(usuarios) > AppSettings.TABLE_LOAD_CHUNKED_FROM:
+            # Reordenar una lista grande con moves costaría una llamada por
+            # fila: es más barato volver a llenarla por tandas
+            self.tree_sync.clear()
+        self._reordenar = False
+        if len(usuarios) - len(self.tree_sync) > AppSettings.TABLE_LOAD_CHUNKED_FROM:
+            # Casi todo es nuevo: se vacía y se llena por tandas
+            self.tree_sync.clear()
+            self.cargador.start(
+                usuarios,
+                lambda u: self.tree_sync.upsert(self.valores_fila(u)),
+                on_progress=self.mostrar_progreso,
+                on_done=self.on_carga_terminada
+            )
+            return
+
+        # Sólo se tocan las filas que cambiaron (el iid es el ID).
+        # Un UserBatch entrega tuplas sin crear un User por fila.
+        filas = (usuarios.rows() if isinstance(usuarios, UserBatch)
+                 else ((u.id, u.nombre, u.rol) for u in usuarios))
+        self.tree_sync.sync(
+            (id, nombre, self.rol_texto(rol)) for id, nombre, rol in filas
+        )
+
+    def mostrar_progreso(self, cargados, total):
+        if cargados < total:
+            self.progreso_label.configure(text=f"Cargando {cargados:,} de {total:,} usuarios…")
+            if not self.progreso_label.winfo_manager():
+                self.progreso_label.pack(fill='x', before=self.encabezados_frame)
+        else:
+            self.progreso_label.pack_forget()
+
+    def on_carga_terminada(self):
+        # Los cambios que llegaron durante la carga se aplican con un diff
+        if self._cambios_pendientes:
+            self._cambios_pendientes = False
+            self.cargar_usuarios()
+
+    @staticmethod
+    def rol_texto(rol):
+        return "Administrador" if rol == 1 else "Usuario"
+
+    @classmethod
+    def valores_fila(cls, user):
+        return (user.id, user.nombre, cls.rol_texto(user.rol))
+
+    def aplicar_cambios(self, cambios):
+        # Con una búsqueda activa no se sabe dónde cae cada fila: se repite
+        # la consulta, que está acotada. Sin cambios conocidos (se perdieron
+        # o son demasiados para aplicarlos aquí) se recarga todo, por tandas
+        # si hace falta.
+        if cambios is None or self.busqueda_var.get().strip():
+            self.cargar_usuarios()
+            return
+
+        # La tabla virtual vuelve a pedir sólo las filas visibles
+        if self.tabla is not None:
+            self.tabla.refresh()
+            return
 
-            if not nombre:
-                self.show_error("El nombre es requerido")
-                return
+        # Las páginas en caché quedan viejas: se descartan y se vuelve a pedir la actual
+        if self.paginador is not None:
+            self.paginador.refresh()
+            return
 
-            usuario = self.auth_service.registrar(nombre, rol)
-            self.show_success(f"Usuario {usuario.nombre} registrado exitosamente")
+        if self.cargador.running:
+            self._cambios_pendientes = True
+            return
 
-            # Limpiar formulario y recargar lista
-            self.nombre_entry.delete(0, 'end')
-            self.rol_combo.set("Usuario")
+        # upsert agrega al final, que sólo es el lugar correcto ordenando
+        # por ID ascendente; con otro orden se repite la consulta y el diff
+        # mueve sólo las filas afectadas
+        if self.orden is not None or self.descendente:
             self.cargar_usuarios()
+            return
+
+        for cambio in cambios:
+            if cambio.op == 'delete':
+                self.tree_sync.delete(cambio.id)
+            else:
+                self.tree_sync.upsert(self.valores_fila(cambio))
+
+    def registrar_usuario(self):
+        nombre = self.nombre_entry.get()
+        rol = 1 if self.rol_combo.get() == "Administrador" else 2
+
+        if not nombre:
+            self.show_error("El nombre es requerido")
+            return
+
+        self.tasks.submit(
+            self.auth_service.registrar,
+            nombre,
+            rol,
+            on_success=self.on_usuario_registrado,
+            on_error=self.on_registro_error
+        )
+
+    def on_registro_error(self, error):
+        if isinstance(error, DatabaseBusyError):
+            self.show_error(
+                "Otra instancia de la aplicación está guardando datos. "
+                "Espera unos segundos e inténtalo de nuevo."
+            )
+        else:
+            self.show_error(str(error))
+
+    def on_usuario_registrado(self, usuario):
+        self.show_success(f"Usuario {usuario.nombre} registrado exitosamente")
 
-        except Exception as e:
-            self.show_error(str(e))
+        # Limpiar formulario; la fila nueva llega por el feed de cambios
+        self.nombre_entry.delete(0, 'end')
+        self.rol_combo.set("Usuario")
+        self.tasks.submit(self.auth_service.poll_changes)
 
     def show_error(self, message):
         CustomDialog(self, "Error", message, ["Aceptar"], dialog_type='error')